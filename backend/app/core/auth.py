@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from app.crud.crud_user import get_user_by_username
 from app.schemas.schemas import TokenData
 
@@ -13,6 +13,11 @@ SECRET_KEY = "geografia_legidepe_secret_key_2024"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Token do stream SSE: vai na query string (EventSource não envia cabeçalhos)
+# e aparece em logs de acesso, então é de curta duração e só vale para ele
+EVENTS_TOKEN_SCOPE = "admin_events"
+EVENTS_TOKEN_EXPIRE_SECONDS = 60
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -25,12 +30,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str, credentials_exception):
+def create_events_token(username: str):
+    return create_access_token(
+        data={"sub": username, "scope": EVENTS_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=EVENTS_TOKEN_EXPIRE_SECONDS)
+    )
+
+def verify_token(token: str, credentials_exception, scope: Optional[str] = None):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
+        # Tokens de escopo restrito não valem como token de acesso e vice-versa
+        if payload.get("scope") != scope:
+            raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
@@ -57,4 +71,23 @@ def get_admin_user(current_user = Depends(get_current_user)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso negado. Privilégios de administrador necessários."
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_admin_user_from_events_token(
+    token: str = Query(..., description="Token de POST /admin/events/token (EventSource não envia cabeçalhos)")
+):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Não foi possível validar as credenciais",
+    )
+    token_data = verify_token(token, credentials_exception, scope=EVENTS_TOKEN_SCOPE)
+    # Sessão própria e fechada logo após a consulta: conexões longas (SSE)
+    # não podem segurar uma conexão do pool enquanto estão abertas
+    db = SessionLocal()
+    try:
+        user = get_user_by_username(db, username=token_data.username)
+    finally:
+        db.close()
+    if user is None:
+        raise credentials_exception
+    return get_admin_user(user)
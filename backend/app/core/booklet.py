@@ -0,0 +1,270 @@
+"""Geração de cadernos de prova imprimíveis (HTML com CSS de impressão).
+
+Cada questão vira um fragmento HTML independente da posição no caderno (a
+numeração vem de contadores CSS), então o fragmento pode ser reaproveitado
+entre provas. Os fragmentos ficam em cache LRU por ``(id, updated_at)``;
+editar a questão muda ``updated_at`` e invalida a entrada. Fragmentos cuja
+imagem não pôde ser reduzida não entram no cache, para nova tentativa.
+
+Fragmentos que não estão no cache são renderizados em lotes em um pool de
+processos quando algum deles ainda precisa gerar a variante reduzida da
+imagem (``uploads/print/``, até ``PRINT_IMAGE_MAX_WIDTH`` px), o trabalho
+pesado; sem imagens a reduzir, a renderização é feita no próprio processo.
+
+Este módulo não importa o ORM: os workers recebem dicionários simples.
+"""
+import html
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+UPLOAD_DIR = "uploads"
+PRINT_IMAGE_DIR = os.path.join(UPLOAD_DIR, "print")
+PRINT_IMAGE_MAX_WIDTH = 800
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("BOOKLET_CACHE_SIZE", "5000"))
+POOL_WORKERS = int(os.getenv("BOOKLET_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Abaixo disso o custo de enviar o lote ao pool supera o da renderização
+MIN_PARALLEL_FRAGMENTS = 16
+
+BOOKLET_FIELDS = (
+    "id", "updated_at", "enunciado", "alternativa_a", "alternativa_b", "alternativa_c",
+    "alternativa_d", "alternativa_e", "url_imagem", "descricao_imagem", "fonte_imagem",
+    "banca", "ano_questao", "resposta_correta", "texto_alternativa_correta",
+)
+
+PRINT_CSS = """
+@page { size: A4; margin: 18mm 16mm; }
+body { font-family: "Times New Roman", serif; font-size: 11.5pt; line-height: 1.4; color: #000; }
+header { border-bottom: 1px solid #000; margin-bottom: 12pt; }
+header h1 { font-size: 15pt; margin: 0 0 4pt; }
+header .campos { display: flex; gap: 24pt; font-size: 10pt; padding-bottom: 6pt; }
+ol.questoes { list-style: none; counter-reset: questao; padding: 0; margin: 0; }
+ol.questoes > li { counter-increment: questao; break-inside: avoid; page-break-inside: avoid; margin-bottom: 14pt; }
+ol.questoes > li::before { content: "Questão " counter(questao); font-weight: bold; display: block; margin-bottom: 3pt; }
+.origem { font-size: 9pt; color: #333; }
+.enunciado p { margin: 0 0 4pt; }
+figure { margin: 6pt 0; text-align: center; }
+figure img { max-width: 100%; max-height: 90mm; }
+figcaption { font-size: 8.5pt; color: #333; }
+ol.alternativas { list-style: upper-alpha; margin: 4pt 0 0 18pt; padding: 0; }
+table.gabarito { border-collapse: collapse; width: 100%; }
+table.gabarito th, table.gabarito td { border: 1px solid #000; padding: 3pt 6pt; text-align: left; vertical-align: top; }
+@media screen { body { max-width: 190mm; margin: 12mm auto; } }
+"""
+
+_cache: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _text(value) -> str:
+    """Escapa o texto e preserva as quebras de parágrafo."""
+    paragraphs = [p for p in (value or "").split("\n") if p.strip()]
+    return "".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
+
+
+def _print_image_paths(url: Optional[str]) -> Optional[Tuple[str, str, str]]:
+    """``(original, variante, URL da variante)`` para imagens enviadas ao servidor.
+
+    ``url_imagem`` é editável por qualquer usuário: caminhos que, resolvidos,
+    saem de ``UPLOAD_DIR`` (``..``, links simbólicos) ou apontam para as
+    próprias variantes levantam ``ValueError``.
+    """
+    if not url or not url.startswith(f"/{UPLOAD_DIR}/"):
+        return None
+    upload_root = os.path.realpath(UPLOAD_DIR)
+    print_root = os.path.realpath(PRINT_IMAGE_DIR)
+    source = os.path.realpath(url.lstrip("/"))
+    if os.path.commonpath([source, upload_root]) != upload_root or os.path.commonpath([source, print_root]) == print_root:
+        raise ValueError(f"Imagem fora de {UPLOAD_DIR}: {url}")
+
+    # Nome completo relativo ao upload (a.png e a.jpg não colidem)
+    variant = os.path.relpath(source, upload_root) + ".jpg"
+    target = os.path.join(PRINT_IMAGE_DIR, variant)
+    return source, target, f"/{UPLOAD_DIR}/print/" + variant.replace(os.sep, "/")
+
+
+def _variant_is_stale(source: str, target: str) -> bool:
+    try:
+        return not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+def needs_image_variant(question: Dict) -> bool:
+    try:
+        paths = _print_image_paths(question.get("url_imagem"))
+    except ValueError:
+        return False
+    return paths is not None and _variant_is_stale(*paths[:2])
+
+
+def print_image_url(url: Optional[str]) -> Tuple[Optional[str], bool]:
+    """URL da variante reduzida da imagem, gerando-a se necessário.
+
+    Retorna ``(url, ok)``; ``ok`` é falso quando a variante não pôde ser
+    gerada e a URL original foi mantida (o fragmento não deve ir para o cache).
+    """
+    try:
+        paths = _print_image_paths(url)
+    except ValueError:
+        return None, True
+    if paths is None:
+        return url, True
+
+    source, target, variant_url = paths
+    try:
+        if _variant_is_stale(source, target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with Image.open(source) as image:
+                image = image.convert("RGB")
+                if image.width > PRINT_IMAGE_MAX_WIDTH:
+                    height = round(image.height * PRINT_IMAGE_MAX_WIDTH / image.width)
+                    image = image.resize((PRINT_IMAGE_MAX_WIDTH, height), Image.LANCZOS)
+                tmp_target = f"{target}.{os.getpid()}.tmp"
+                image.save(tmp_target, "JPEG", quality=82, optimize=True)
+                os.replace(tmp_target, target)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return url, False
+    if not os.path.exists(target):
+        # Original ausente: mantém a URL enviada
+        return url, False
+    return variant_url, True
+
+
+def render_fragment(question: Dict) -> Tuple[str, bool]:
+    """Fragmento da questão e se ele pode ir para o cache."""
+    origem = " ".join(str(v) for v in (question.get("banca"), question.get("ano_questao")) if v)
+    parts = ["<li>"]
+    if origem:
+        parts.append(f'<div class="origem">({html.escape(origem)})</div>')
+    parts.append(f'<div class="enunciado">{_text(question["enunciado"])}</div>')
+
+    image_url, cacheable = print_image_url(question.get("url_imagem"))
+    if image_url:
+        caption = " — ".join(
+            html.escape(v) for v in (question.get("descricao_imagem"), question.get("fonte_imagem")) if v
+        )
+        alt = html.escape(question.get("descricao_imagem") or "", quote=True)
+        parts.append(f'<figure><img src="{html.escape(image_url, quote=True)}" alt="{alt}">')
+        if caption:
+            parts.append(f"<figcaption>{caption}</figcaption>")
+        parts.append("</figure>")
+
+    parts.append('<ol class="alternativas">')
+    for letter in "abcde":
+        parts.append(f"<li>{html.escape(question['alternativa_' + letter] or '')}</li>")
+    parts.append("</ol></li>")
+    return "".join(parts), cacheable
+
+
+def render_fragments(questions: List[Dict]) -> List[Tuple[str, bool]]:
+    """Executado nos workers do pool: renderiza um lote de questões."""
+    return [render_fragment(question) for question in questions]
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: os workers não herdam a thread do LISTEN nem as conexões
+            # do pool do SQLAlchemy, como aconteceria com fork
+            _executor = ProcessPoolExecutor(
+                max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _cache_key(question: Dict) -> Tuple[int, str]:
+    updated_at = question.get("updated_at")
+    return question["id"], updated_at.isoformat() if updated_at else ""
+
+
+def question_fragments(questions: List[Dict]) -> List[str]:
+    """Fragmentos na ordem de ``questions``, usando o cache e o pool."""
+    keys = [_cache_key(question) for question in questions]
+    fragments: List[Optional[str]] = []
+    with _cache_lock:
+        for key in keys:
+            fragment = _cache.get(key)
+            if fragment is not None:
+                _cache.move_to_end(key)
+            fragments.append(fragment)
+
+    missing = [i for i, fragment in enumerate(fragments) if fragment is None]
+    if missing:
+        pending = [questions[i] for i in missing]
+        # Sem imagens a reduzir, o pool só acrescentaria custo de comunicação
+        if (
+            len(pending) < MIN_PARALLEL_FRAGMENTS or POOL_WORKERS <= 1
+            or not any(needs_image_variant(question) for question in pending)
+        ):
+            rendered = render_fragments(pending)
+        else:
+            chunk_size = -(-len(pending) // POOL_WORKERS)
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            rendered = [result for chunk in _get_executor().map(render_fragments, chunks) for result in chunk]
+
+        with _cache_lock:
+            for i, (fragment, cacheable) in zip(missing, rendered):
+                fragments[i] = fragment
+                if cacheable:
+                    _cache[keys[i]] = fragment
+                    _cache.move_to_end(keys[i])
+            while len(_cache) > FRAGMENT_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return fragments
+
+
+def _document(title: str, body: str, base_url: Optional[str]) -> str:
+    base = f'<base href="{html.escape(base_url, quote=True)}">' if base_url else ""
+    return (
+        "<!DOCTYPE html>"
+        f'<html lang="pt-BR"><head><meta charset="utf-8">{base}'
+        f"<title>{html.escape(title)}</title><style>{PRINT_CSS}</style></head>"
+        f"<body>{body}</body></html>"
+    )
+
+
+def render_booklet(title: str, questions: List[Dict], base_url: Optional[str] = None) -> str:
+    header = (
+        f"<header><h1>{html.escape(title)}</h1>"
+        '<div class="campos"><span>Nome: ____________________________________</span>'
+        "<span>Turma: ________</span><span>Data: ___/___/_____</span></div></header>"
+    )
+    fragments = "".join(question_fragments(questions))
+    return _document(title, f'{header}<ol class="questoes">{fragments}</ol>', base_url)
+
+
+def render_answer_key(title: str, questions: List[Dict]) -> str:
+    rows = "".join(
+        f"<tr><td>{number}</td><td>{question['id']}</td>"
+        f"<td>{html.escape(question['resposta_correta'])}</td>"
+        f"<td>{html.escape(question['texto_alternativa_correta'] or '')}</td></tr>"
+        for number, question in enumerate(questions, 1)
+    )
+    body = (
+        f"<header><h1>{html.escape(title)} — Gabarito</h1>"
+        f'<div class="campos"><span>Gerado em {date.today().strftime("%d/%m/%Y")}</span></div></header>'
+        '<table class="gabarito"><thead><tr><th>Questão</th><th>ID</th><th>Resposta</th>'
+        f"<th>Alternativa correta</th></tr></thead><tbody>{rows}</tbody></table>"
+    )
+    return _document(f"{title} — Gabarito", body, None)
@@ -0,0 +1,116 @@
+"""Compressão gzip/brotli das respostas, negociada pelo ``Accept-Encoding``.
+
+Só comprime respostas completas (não-streaming) acima de ``minimum_size``
+bytes. Respostas em streaming (eventos SSE, arquivos) e formatos já
+comprimidos, como o Excel (.xlsx é um zip), passam sem alteração. O brotli é usado quando o pacote ``brotli`` está instalado e o
+cliente o aceita; caso contrário, gzip.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+# Tipos já comprimidos ou que não devem ser bufferizados
+SKIP_MEDIA_TYPES = (
+    "image/", "video/", "audio/", "text/event-stream", "application/zip", "application/gzip",
+    "application/vnd.openxmlformats-officedocument", "application/vnd.sqlite3",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Converte ``gzip;q=0.8, br`` em ``{"gzip": 0.8, "br": 1.0}``."""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header: str):
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        # Qualidade 4: boa taxa sem o custo dos níveis altos do brotli
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            response_headers = dict(start_message["headers"])
+            content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in response_headers
+                or content_type.startswith(SKIP_MEDIA_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            raw_headers = [
+                (name, value) for name, value in start_message["headers"]
+                if name not in (b"content-length", b"vary")
+            ]
+            vary = response_headers.get(b"vary")
+            raw_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": raw_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
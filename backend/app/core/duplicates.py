@@ -0,0 +1,196 @@
+"""Índice MinHash + LSH para detectar questões quase duplicadas.
+
+O texto da questão (enunciado + alternativas) é normalizado (minúsculas, sem
+acentos nem pontuação) e quebrado em shingles de 3 palavras. A assinatura
+MinHash tem ``num_perm`` valores; cada permutação é um XOR do hash de 64 bits
+do shingle com uma máscara aleatória fixa, o que mantém o cálculo em laços C
+(``min(map(...))``) e a assinatura abaixo de 1 ms.
+
+O LSH divide a assinatura em ``bands`` faixas; questões que coincidem em
+alguma faixa são candidatas, e só elas têm a similaridade estimada. Com 16
+faixas de 4 linhas, pares com Jaccard acima de ~0.5 colidem com alta
+probabilidade, sem varrer o banco inteiro.
+"""
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SHINGLE_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> List[str]:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _WORD_RE.findall(stripped.casefold())
+
+
+def question_text(question) -> str:
+    """Texto usado na comparação, a partir de um modelo do ORM ou schema."""
+    return " ".join(
+        getattr(question, field) or ""
+        for field in (
+            "enunciado", "alternativa_a", "alternativa_b",
+            "alternativa_c", "alternativa_d", "alternativa_e",
+        )
+    )
+
+
+def _shingle_hashes(text: str) -> Set[int]:
+    words = normalize_text(text)
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    }
+
+
+class DuplicateIndex:
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.6, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands")
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._signatures: Dict[int, Tuple[int, ...]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = defaultdict(set)
+        # Alterações feitas durante um rebuild, reaplicadas ao final dele
+        self._touched: Optional[Dict[int, Optional[Tuple[int, ...]]]] = None
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        hashes = _shingle_hashes(text)
+        if not hashes:
+            return None
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    @staticmethod
+    def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+    def _remove(self, question_id: int):
+        old = self._signatures.pop(question_id, None)
+        if old is None:
+            return
+        for key in self._band_keys(old):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(question_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _add(self, question_id: int, signature: Tuple[int, ...]):
+        self._signatures[question_id] = signature
+        for key in self._band_keys(signature):
+            self._buckets[key].add(question_id)
+
+    def upsert(self, question_id: int, text: str):
+        signature = self.signature(text)
+        with self._lock:
+            self._remove(question_id)
+            if signature is not None:
+                self._add(question_id, signature)
+            if self._touched is not None:
+                self._touched[question_id] = signature
+
+    def discard(self, question_id: int):
+        with self._lock:
+            self._remove(question_id)
+            if self._touched is not None:
+                self._touched[question_id] = None
+
+    def rebuild(self, items: Iterable[Tuple[int, str]]):
+        """Reconstrói o índice; pode rodar em segundo plano com escritas concorrentes."""
+        with self._lock:
+            self._touched = {}
+        try:
+            signatures = [(question_id, self.signature(text)) for question_id, text in items]
+        except Exception:
+            with self._lock:
+                self._touched = None
+            raise
+
+        with self._lock:
+            touched, self._touched = self._touched, None
+            self._signatures = {}
+            self._buckets = defaultdict(set)
+            for question_id, signature in signatures:
+                if signature is not None and question_id not in touched:
+                    self._add(question_id, signature)
+            for question_id, signature in touched.items():
+                if signature is not None:
+                    self._add(question_id, signature)
+
+    def query(self, text: str, exclude_id: Optional[int] = None, limit: Optional[int] = 10) -> List[Tuple[int, float]]:
+        """Questões parecidas com ``text``, da mais para a menos similar (todas com ``limit=None``)."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+            candidates.discard(exclude_id)
+            scored = [
+                (question_id, self.similarity(signature, self._signatures[question_id]))
+                for question_id in candidates
+            ]
+
+        matches = [(question_id, score) for question_id, score in scored if score >= self.threshold]
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+    def clusters(self) -> List[List[int]]:
+        """Grupos de questões quase duplicadas (componentes conexos)."""
+        with self._lock:
+            buckets = [list(bucket) for bucket in self._buckets.values() if len(bucket) > 1]
+            signatures = dict(self._signatures)
+
+        parent: Dict[int, int] = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        checked = set()
+        for bucket in buckets:
+            bucket.sort()
+            for i, a in enumerate(bucket):
+                for b in bucket[i + 1:]:
+                    if (a, b) in checked:
+                        continue
+                    checked.add((a, b))
+                    if self.similarity(signatures[a], signatures[b]) >= self.threshold:
+                        parent[find(a)] = find(b)
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for question_id in parent:
+            groups[find(question_id)].append(question_id)
+        clusters = [sorted(ids) for ids in groups.values() if len(ids) > 1]
+        clusters.sort(key=lambda ids: (-len(ids), ids[0]))
+        return clusters
+
+
+duplicate_index = DuplicateIndex()
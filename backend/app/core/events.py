@@ -0,0 +1,140 @@
+"""Eventos de questões distribuídos via Postgres LISTEN/NOTIFY.
+
+As escritas em ``crud_question`` chamam ``publish_question_event`` dentro da
+própria transação, então o ``NOTIFY`` só é entregue se o commit acontecer.
+Cada processo mantém uma única conexão em ``LISTEN`` (``QuestionEventListener``)
+que repassa os eventos para:
+
+- os clientes SSE conectados neste processo (``question_events``), cada um
+  com sua fila asyncio;
+- callbacks locais registrados com ``add_listener``, usados para manter os
+  índices em memória sincronizados com as escritas de outros workers.
+"""
+import asyncio
+import json
+import select
+import threading
+from typing import Callable, List, Set
+from uuid import uuid4
+
+from sqlalchemy import text
+
+QUESTION_EVENTS_CHANNEL = "question_events"
+
+# Identifica o processo de origem do evento
+PROCESS_ID = uuid4().hex
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def publish_question_event(db, event_type: str, question):
+    """Agenda um evento; é entregue aos ouvintes no commit de ``db``."""
+    payload = {
+        "type": event_type,
+        "question_id": question.id,
+        "user_id": question.user_id,
+        "status": question.status,
+        "tema_principal": question.tema_principal,
+        "origin": PROCESS_ID,
+    }
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": QUESTION_EVENTS_CHANNEL, "payload": json.dumps(payload)},
+    )
+
+
+class EventBroker:
+    """Distribui eventos para as filas dos clientes SSE deste processo."""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listeners: List[Callable[[dict], None]] = []
+        self._loop = None
+
+    def bind_loop(self, loop):
+        self._loop = loop
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        self._listeners.append(callback)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, event: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta o evento em vez de acumular memória
+                pass
+
+    def dispatch(self, event: dict):
+        """Chamado pela thread do listener para cada notificação recebida."""
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Erro ao processar evento {event.get('type')}: {e}")
+        if self._loop is not None and self._subscribers:
+            self._loop.call_soon_threadsafe(self._publish, event)
+
+
+question_events = EventBroker()
+
+
+class QuestionEventListener(threading.Thread):
+    """Thread com uma conexão dedicada em ``LISTEN``, fora do pool."""
+
+    def __init__(self, engine, broker: EventBroker = question_events, poll_interval: float = 1.0):
+        super().__init__(name="question-events", daemon=True)
+        self.engine = engine
+        self.broker = broker
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _connect(self):
+        raw = self.engine.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {QUESTION_EVENTS_CHANNEL}")
+        cursor.close()
+        return raw, conn
+
+    def run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            raw = None
+            try:
+                raw, conn = self._connect()
+                backoff = 1.0
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            event = json.loads(notify.payload)
+                        except ValueError:
+                            continue
+                        self.broker.dispatch(event)
+            except Exception as e:
+                print(f"Conexão de eventos perdida: {e}; reconectando em {backoff:.0f}s")
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
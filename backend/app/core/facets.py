@@ -0,0 +1,164 @@
+"""Índice em memória dos valores distintos de campos filtráveis (facetas).
+
+Para cada campo de ``FACET_FIELDS`` guarda quantas questões usam cada valor,
+agrupando as variações de escrita pela forma normalizada (sem acentos,
+minúsculas, espaços colapsados): "Geografia Física" e "geografia fisica"
+contam como um só valor, exibido na grafia mais usada.
+
+As chaves normalizadas ficam em uma lista ordenada por campo, então o
+autocomplete por prefixo é uma busca binária (``bisect``), sem consultar o
+Postgres. O índice é montado no startup e atualizado pelas escritas em
+``crud_question``.
+
+Há dois índices: ``facet_index``, com todas as questões, para admins, e
+``approved_facet_index``, só com as aprovadas, para os demais usuários, que
+não podem ver questões pendentes ou rejeitadas de outras pessoas.
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+FACET_FIELDS = ("tema_principal", "subtopico", "nivel_escolar", "banca", "ano_questao")
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_value(value) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES_RE.sub(" ", stripped).strip().casefold()
+
+
+def facet_values(question) -> Tuple:
+    """Valores das facetas de uma questão (modelo do ORM ou linha de consulta)."""
+    return tuple(getattr(question, field) for field in FACET_FIELDS)
+
+
+class FacetIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.ready = False
+        # Alterações feitas durante um rebuild, reaplicadas ao final dele
+        self._touched: Optional[Dict[int, Optional[Tuple]]] = None
+
+    def _reset(self):
+        # campo -> chave normalizada -> Counter das grafias originais
+        self._variants: Dict[str, Dict[str, Counter]] = {field: {} for field in FACET_FIELDS}
+        # campo -> chaves normalizadas em ordem, para busca por prefixo
+        self._keys: Dict[str, List[str]] = {field: [] for field in FACET_FIELDS}
+        self._by_question: Dict[int, Tuple] = {}
+
+    def _add(self, question_id: int, values: Tuple):
+        self._by_question[question_id] = values
+        for field, value in zip(FACET_FIELDS, values):
+            if value is None or value == "":
+                continue
+            key = normalize_value(value)
+            variants = self._variants[field].get(key)
+            if variants is None:
+                variants = self._variants[field][key] = Counter()
+                insort(self._keys[field], key)
+            variants[value] += 1
+
+    def _remove(self, question_id: int):
+        values = self._by_question.pop(question_id, None)
+        if values is None:
+            return
+        for field, value in zip(FACET_FIELDS, values):
+            if value is None or value == "":
+                continue
+            key = normalize_value(value)
+            variants = self._variants[field][key]
+            variants[value] -= 1
+            if variants[value] <= 0:
+                del variants[value]
+            if not variants:
+                del self._variants[field][key]
+                keys = self._keys[field]
+                del keys[bisect_left(keys, key)]
+
+    def upsert(self, question_id: int, values: Tuple):
+        with self._lock:
+            self._remove(question_id)
+            self._add(question_id, values)
+            if self._touched is not None:
+                self._touched[question_id] = values
+
+    def discard(self, question_id: int):
+        with self._lock:
+            self._remove(question_id)
+            if self._touched is not None:
+                self._touched[question_id] = None
+
+    def rebuild(self, items: Iterable[Tuple[int, Tuple]]):
+        with self._lock:
+            self._touched = {}
+        try:
+            rows = list(items)
+        except Exception:
+            with self._lock:
+                self._touched = None
+            raise
+
+        with self._lock:
+            touched, self._touched = self._touched, None
+            self._reset()
+            for question_id, values in rows:
+                if question_id not in touched:
+                    self._add(question_id, values)
+            for question_id, values in touched.items():
+                if values is not None:
+                    self._add(question_id, values)
+            self.ready = True
+
+    def _entry(self, field: str, key: str) -> dict:
+        variants = self._variants[field][key]
+        # Exibe a grafia mais usada; empates resolvidos pela ordem alfabética
+        value = min(variants, key=lambda v: (-variants[v], str(v)))
+        return {"value": value, "count": sum(variants.values())}
+
+    def facets(self, fields: Iterable[str] = FACET_FIELDS) -> Dict[str, List[dict]]:
+        with self._lock:
+            result = {}
+            for field in fields:
+                entries = [self._entry(field, key) for key in self._keys[field]]
+                entries.sort(key=lambda entry: -entry["count"])
+                result[field] = entries
+            return result
+
+    def complete(self, field: str, prefix: str, limit: int = 10) -> List[dict]:
+        """Valores de ``field`` cuja forma normalizada começa com ``prefix``."""
+        prefix = normalize_value(prefix)
+        with self._lock:
+            keys = self._keys[field]
+            entries = []
+            for i in range(bisect_left(keys, prefix), len(keys)):
+                if not keys[i].startswith(prefix):
+                    break
+                entries.append(self._entry(field, keys[i]))
+        entries.sort(key=lambda entry: -entry["count"])
+        return entries[:limit]
+
+    def matching_values(self, field: str, term: str) -> Optional[List]:
+        """Grafias originais que contêm ``term`` (ignorando acentos e caixa).
+
+        Retorna ``None`` enquanto o índice não foi montado.
+        """
+        if not self.ready:
+            return None
+        term = normalize_value(term)
+        with self._lock:
+            return [
+                value
+                for key, variants in self._variants[field].items()
+                if term in key
+                for value in variants
+            ]
+
+
+facet_index = FacetIndex()
+approved_facet_index = FacetIndex()
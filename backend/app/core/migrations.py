@@ -0,0 +1,167 @@
+"""Migrações versionadas do esquema do banco.
+
+Cada arquivo ``migrations/NNNN_descricao.sql`` é aplicado uma única vez, em
+ordem de versão, e registrado na tabela ``schema_migrations``. O DDL não roda
+mais na importação da aplicação: use ``python manage.py migrate``.
+
+Scripts que começam com ``-- migrate:no-transaction`` rodam fora de transação,
+um comando por vez, o que permite ``CREATE INDEX CONCURRENTLY``. Nesses
+scripts os comandos são separados por linhas ``-- migrate:statement`` (e não
+por ``;``, que pode aparecer em corpos ``$$`` e literais). Se um desses
+comandos falhar, o Postgres pode deixar um índice INVALID para trás; remova-o
+com ``DROP INDEX CONCURRENTLY`` antes de rodar a migração novamente.
+"""
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import List
+
+MIGRATIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "migrations"))
+
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+STATEMENT_SEPARATOR = "-- migrate:statement"
+
+# Chave do pg_advisory_lock que serializa processos migrando ao mesmo tempo
+MIGRATION_LOCK_KEY = 74_210_026
+
+_FILENAME_RE = re.compile(r"^(\d+)_([\w\-]+)\.sql$")
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+    def statements(self) -> List[str]:
+        """Comandos do script, para execução fora de transação."""
+        statements = []
+        chunk: List[str] = []
+        for line in self.sql.splitlines() + [STATEMENT_SEPARATOR]:
+            if line.strip() != STATEMENT_SEPARATOR:
+                chunk.append(line)
+                continue
+            if any(l.strip() and not l.strip().startswith("--") for l in chunk):
+                statements.append("\n".join(chunk).strip())
+            chunk = []
+        return statements
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            migrations.append(Migration(int(match.group(1)), match.group(2), f.read()))
+
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Versões de migração duplicadas em " + directory)
+    return migrations
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum VARCHAR(64) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+def _applied_migrations(cursor) -> dict:
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cursor.fetchall())
+
+
+def get_status(engine, directory: str = MIGRATIONS_DIR):
+    """Lista ``(migração, aplicada, checksum_confere)`` para cada script."""
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    try:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        applied = _applied_migrations(cursor)
+        cursor.close()
+    finally:
+        conn.autocommit = False
+        raw.close()
+
+    return [
+        (m, m.version in applied, applied.get(m.version, m.checksum) == m.checksum)
+        for m in load_migrations(directory)
+    ]
+
+
+def run_migrations(engine, directory: str = MIGRATIONS_DIR, log=print) -> List[Migration]:
+    """Aplica as migrações pendentes e retorna as que foram aplicadas."""
+    migrations = load_migrations(directory)
+    applied_now = []
+
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    try:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        # Vários workers/deploys podem chamar o migrate ao mesmo tempo
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        try:
+            _ensure_migrations_table(cursor)
+            applied = _applied_migrations(cursor)
+
+            for migration in migrations:
+                if migration.version in applied:
+                    if applied[migration.version] != migration.checksum:
+                        log(f"AVISO: migração {migration.version:04d}_{migration.name} foi alterada após ser aplicada")
+                    continue
+
+                log(f"Aplicando {migration.version:04d}_{migration.name}...")
+                if migration.transactional:
+                    conn.autocommit = False
+                    try:
+                        cursor.execute(migration.sql)
+                        _record(cursor, migration)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                    finally:
+                        conn.autocommit = True
+                else:
+                    for statement in migration.statements():
+                        cursor.execute(statement)
+                    _record(cursor, migration)
+                applied_now.append(migration)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            cursor.close()
+    finally:
+        # A conexão volta para o pool; não deixar autocommit ligado
+        conn.autocommit = False
+        raw.close()
+
+    return applied_now
+
+
+def _record(cursor, migration: Migration):
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+        (migration.version, migration.name, migration.checksum),
+    )
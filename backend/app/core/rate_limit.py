@@ -0,0 +1,243 @@
+"""Controle de admissão: rate limit por usuário/IP e descarte de carga.
+
+Cada requisição consome uma ficha do token bucket da sua categoria (``auth``,
+``write``, ``read`` ou ``export``), identificada pelo usuário do JWT ou, sem
+token, pelo IP. Sem fichas, a resposta é 429 com ``Retry-After``.
+
+Antes de chegar à aplicação, a requisição também é recusada com 503 quando
+há requisições demais em andamento neste processo ou quando todas as
+conexões do pool do banco já estão em uso, em vez de esperar na fila.
+
+Sem token, o IP é o do socket (``scope["client"]``, já corrigido pelo
+uvicorn quando o proxy está em ``FORWARDED_ALLOW_IPS``). O ``X-Forwarded-For``
+só é lido com ``TRUSTED_PROXY_HOPS`` maior que zero: o número de proxies
+confiáveis na frente da aplicação, cada um acrescentando um endereço ao
+cabeçalho. Atrás de um proxy (como no Railway, onde os IPs do proxy variam e
+``TRUSTED_PROXY_HOPS=1``), uma das duas configurações é obrigatória: sem ela,
+todos os clientes anônimos caem no bucket do IP do proxy.
+
+O estado fica em memória por padrão (``MemoryBackend``). Com
+``RATE_LIMIT_REDIS_URL`` definido, os buckets são compartilhados entre
+workers via ``RedisBackend``; qualquer servidor compatível com Redis serve.
+"""
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.responses import ORJSONResponse
+
+
+@dataclass(frozen=True)
+class Budget:
+    rate: float  # fichas repostas por segundo
+    capacity: int  # rajada máxima
+
+
+DEFAULT_BUDGETS: Dict[str, Budget] = {
+    "auth": Budget(rate=10 / 60, capacity=10),
+    "write": Budget(rate=1.0, capacity=20),
+    "read": Budget(rate=10.0, capacity=60),
+    "export": Budget(rate=1 / 60, capacity=3),
+}
+
+# Caminhos que não passam pelo controle (estáticos, documentação, health check)
+EXEMPT_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json", "/uploads")
+
+# Conexões longas: contam no rate limit, mas não como requisição em andamento
+LONG_LIVED_PATHS = ("/admin/events",)
+
+EXPORT_PREFIXES = ("/admin/export", "/admin/snapshot", "/admin/booklet")
+
+
+class MemoryBackend:
+    """Buckets em memória, locais a este processo."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, budget: Budget, cost: float = 1.0) -> float:
+        """Consome ``cost`` fichas; retorna 0 ou os segundos até haver fichas."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (budget.capacity, now))
+            tokens = min(budget.capacity, tokens + (now - last) * budget.rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (cost - tokens) / budget.rate
+            if len(self._buckets) > self.max_keys:
+                self._evict(now)
+        return wait
+
+    def _evict(self, now: float):
+        # Remove os buckets parados há mais tempo (já estariam cheios de novo)
+        by_age = sorted(self._buckets.items(), key=lambda item: item[1][1])
+        for key, _ in by_age[: len(by_age) // 2]:
+            del self._buckets[key]
+
+
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Buckets compartilhados entre processos em um servidor Redis.
+
+    ``client`` é qualquer cliente assíncrono com ``eval`` (``redis.asyncio``,
+    ``fakeredis.aioredis`` em desenvolvimento local).
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str):
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url))
+
+    async def take(self, key: str, budget: Budget, cost: float = 1.0) -> float:
+        wait = await self.client.eval(
+            _REDIS_TOKEN_BUCKET, 1, self.prefix + key, budget.rate, budget.capacity, cost
+        )
+        return float(wait)
+
+
+def backend_from_env():
+    url = os.getenv("RATE_LIMIT_REDIS_URL")
+    if url:
+        return RedisBackend.from_url(url)
+    return MemoryBackend()
+
+
+def classify_request(method: str, path: str) -> str:
+    if path.startswith("/auth"):
+        return "auth"
+    if path.startswith(EXPORT_PREFIXES):
+        return "export"
+    if method in ("POST", "PUT", "PATCH", "DELETE"):
+        return "write"
+    return "read"
+
+
+def client_identity(scope, secret_key: str, algorithm: str, trusted_proxy_hops: int = 0) -> str:
+    headers = dict(scope["headers"])
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    if authorization.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(authorization[7:], secret_key, algorithms=[algorithm])
+            if payload.get("sub"):
+                return "user:" + payload["sub"]
+        except JWTError:
+            pass
+
+    # Com N proxies confiáveis, o N-ésimo endereço a partir da direita foi
+    # adicionado pelo primeiro deles; os anteriores vêm do cliente e podem ser
+    # forjados. Sem proxy configurado, o cabeçalho é ignorado
+    if trusted_proxy_hops > 0:
+        forwarded = [
+            address.strip()
+            for address in headers.get(b"x-forwarded-for", b"").decode("latin-1").split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= trusted_proxy_hops:
+            return "ip:" + forwarded[-trusted_proxy_hops]
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "desconhecido")
+
+
+def pool_saturated(engine, max_connections: int) -> bool:
+    checkedout = getattr(engine.pool, "checkedout", None)
+    return checkedout is not None and checkedout() >= max_connections
+
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app,
+        secret_key: str,
+        algorithm: str,
+        backend=None,
+        budgets: Optional[Dict[str, Budget]] = None,
+        max_in_flight: int = 64,
+        engine=None,
+        max_db_connections: Optional[int] = None,
+        trusted_proxy_hops: int = 0,
+    ):
+        self.app = app
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.backend = backend or MemoryBackend()
+        self.budgets = budgets or DEFAULT_BUDGETS
+        self.max_in_flight = max_in_flight
+        self.engine = engine
+        self.max_db_connections = max_db_connections
+        self.trusted_proxy_hops = trusted_proxy_hops
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        category = classify_request(scope["method"], path)
+        identity = client_identity(scope, self.secret_key, self.algorithm, self.trusted_proxy_hops)
+        wait = await self.backend.take(f"{category}:{identity}", self.budgets[category])
+        if wait > 0:
+            await self._reject(scope, receive, send, 429, "Muitas requisições. Tente novamente em instantes.", wait)
+            return
+
+        if path in LONG_LIVED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_in_flight or (
+            self.engine is not None and self.max_db_connections
+            and pool_saturated(self.engine, self.max_db_connections)
+        ):
+            await self._reject(scope, receive, send, 503, "Servidor sobrecarregado. Tente novamente em instantes.", 1)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: float):
+        response = ORJSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
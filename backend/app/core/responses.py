@@ -0,0 +1,38 @@
+"""Serialização rápida das respostas JSON.
+
+``ORJSONResponse`` é a classe de resposta padrão da aplicação. Para as rotas
+que devolvem listas grandes, ``model_response``/``model_list_response`` validam
+as linhas do ORM e geram os bytes JSON direto no núcleo do Pydantic v2, sem o
+passo intermediário de ``jsonable_encoder`` + ``json.dumps``.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def model_response(model: Type[BaseModel], obj: Any, status_code: int = 200) -> Response:
+    """Serializa um objeto do ORM com o schema ``model``."""
+    content = model.model_validate(obj, from_attributes=True).model_dump_json()
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
+
+def model_list_response(model: Type[BaseModel], rows: Iterable[Any], status_code: int = 200) -> Response:
+    """Serializa uma lista de objetos do ORM com o schema ``model``."""
+    adapter = _list_adapter(model)
+    content = adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+    return Response(content=content, status_code=status_code, media_type="application/json")
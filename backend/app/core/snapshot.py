@@ -0,0 +1,248 @@
+"""Snapshot SQLite offline das questões aprovadas, com busca FTS5.
+
+O arquivo gerado contém:
+
+- ``questions``: as questões aprovadas (sem dados de usuário);
+- ``questions_fts``: índice FTS5 (external content) sobre o enunciado e as
+  alternativas, sem acentos (``remove_diacritics``);
+- ``images``: manifesto das imagens (URL, descrição e fonte) por questão;
+- ``snapshot_meta``: data da última alteração incluída e do build.
+
+O build é incremental: parte do snapshot anterior, busca no Postgres só as
+questões com ``updated_at`` a partir da última alteração incluída e remove as
+que deixaram de estar aprovadas. O novo arquivo é escrito em uma cópia e
+trocado atomicamente, então leitores nunca veem um snapshot pela metade.
+
+Busca local, por exemplo::
+
+    SELECT q.* FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid
+    WHERE questions_fts MATCH 'climograma' ORDER BY rank
+"""
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.models import Question
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join("snapshots", "questoes_aprovadas.sqlite3"))
+
+SNAPSHOT_COLUMNS = [
+    "id", "tema_principal", "subtopico", "enunciado", "tipo_questao",
+    "url_imagem", "descricao_imagem", "fonte_imagem", "nivel_escolar",
+    "alternativa_a", "alternativa_b", "alternativa_c", "alternativa_d", "alternativa_e",
+    "resposta_correta", "texto_alternativa_correta", "dica", "fonte_bibliografica",
+    "ano_questao", "banca", "data_cadastro", "updated_at",
+]
+
+FTS_COLUMNS = ["enunciado", "alternativa_a", "alternativa_b", "alternativa_c", "alternativa_d", "alternativa_e"]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    tema_principal TEXT NOT NULL,
+    subtopico TEXT NOT NULL,
+    enunciado TEXT NOT NULL,
+    tipo_questao TEXT NOT NULL,
+    url_imagem TEXT,
+    descricao_imagem TEXT,
+    fonte_imagem TEXT,
+    nivel_escolar TEXT NOT NULL,
+    alternativa_a TEXT NOT NULL,
+    alternativa_b TEXT NOT NULL,
+    alternativa_c TEXT NOT NULL,
+    alternativa_d TEXT NOT NULL,
+    alternativa_e TEXT NOT NULL,
+    resposta_correta TEXT NOT NULL,
+    texto_alternativa_correta TEXT NOT NULL,
+    dica TEXT,
+    fonte_bibliografica TEXT,
+    ano_questao INTEGER,
+    banca TEXT,
+    data_cadastro TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_questions_tema_principal ON questions (tema_principal);
+CREATE INDEX IF NOT EXISTS ix_questions_nivel_escolar ON questions (nivel_escolar);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    {", ".join(FTS_COLUMNS)},
+    content='questions', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+
+-- Mantêm o índice FTS (external content) em sincronia com a tabela
+CREATE TRIGGER IF NOT EXISTS questions_ai AFTER INSERT ON questions BEGIN
+    INSERT INTO questions_fts (rowid, {", ".join(FTS_COLUMNS)})
+    VALUES (new.id, {", ".join("new." + c for c in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS questions_ad AFTER DELETE ON questions BEGIN
+    INSERT INTO questions_fts (questions_fts, rowid, {", ".join(FTS_COLUMNS)})
+    VALUES ('delete', old.id, {", ".join("old." + c for c in FTS_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS questions_au AFTER UPDATE ON questions BEGIN
+    INSERT INTO questions_fts (questions_fts, rowid, {", ".join(FTS_COLUMNS)})
+    VALUES ('delete', old.id, {", ".join("old." + c for c in FTS_COLUMNS)});
+    INSERT INTO questions_fts (rowid, {", ".join(FTS_COLUMNS)})
+    VALUES (new.id, {", ".join("new." + c for c in FTS_COLUMNS)});
+END;
+
+CREATE TABLE IF NOT EXISTS images (
+    question_id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    descricao TEXT,
+    fonte TEXT
+);
+
+CREATE TABLE IF NOT EXISTS snapshot_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT_QUESTION = (
+    f"INSERT INTO questions ({', '.join(SNAPSHOT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in SNAPSHOT_COLUMNS)}) "
+    f"ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in SNAPSHOT_COLUMNS if c != "id")
+)
+
+_UPSERT_IMAGE = (
+    "INSERT INTO images (question_id, url, descricao, fonte) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (question_id) DO UPDATE SET url = excluded.url, "
+    "descricao = excluded.descricao, fonte = excluded.fonte"
+)
+
+# Transações que começaram antes do último build e fizeram commit depois dele
+# têm updated_at anterior ao registrado; a janela de sobreposição as recupera
+SNAPSHOT_OVERLAP = timedelta(minutes=5)
+
+# Um build por vez neste processo
+_build_lock = threading.Lock()
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _sqlite_value(value):
+    if isinstance(value, datetime):
+        return _as_utc(value).isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _get_meta(conn, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM snapshot_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(conn, key: str, value):
+    conn.execute(
+        "INSERT INTO snapshot_meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+        (key, str(value)),
+    )
+
+
+def _delete_ids(conn, table: str, column: str, ids):
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        conn.execute(
+            f"DELETE FROM {table} WHERE {column} IN ({', '.join('?' for _ in chunk)})", chunk
+        )
+
+
+def build_snapshot(db: Session, path: str = SNAPSHOT_PATH) -> dict:
+    """Atualiza (ou cria) o snapshot em ``path`` e retorna estatísticas do build."""
+    with _build_lock:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(path):
+            shutil.copyfile(path, tmp_path)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(_SCHEMA)
+            last_updated_at = _get_meta(conn, "last_updated_at")
+
+            approved_ids = {
+                question_id for (question_id,) in
+                db.query(Question.id).filter(Question.status == "approved")
+            }
+            existing = dict(conn.execute("SELECT id, updated_at FROM questions"))
+            existing_ids = set(existing)
+
+            removed_ids = existing_ids - approved_ids
+            _delete_ids(conn, "questions", "id", removed_ids)
+            _delete_ids(conn, "images", "question_id", removed_ids)
+
+            columns = [getattr(Question, c) for c in SNAPSHOT_COLUMNS]
+            query = db.query(*columns).filter(Question.status == "approved")
+            if last_updated_at is not None:
+                since = datetime.fromisoformat(last_updated_at) - SNAPSHOT_OVERLAP
+                # Aprovadas que faltam no snapshot, mesmo sem alteração recente
+                missing_ids = approved_ids - existing_ids
+                if missing_ids:
+                    query = query.filter(or_(Question.updated_at >= since, Question.id.in_(missing_ids)))
+                else:
+                    query = query.filter(Question.updated_at >= since)
+
+            upserted = 0
+            newest = datetime.fromisoformat(last_updated_at) if last_updated_at else None
+            for row in query.yield_per(1000):
+                values = [_sqlite_value(value) for value in row]
+                if existing.get(row.id) == _sqlite_value(row.updated_at):
+                    continue
+                conn.execute(_UPSERT_QUESTION, values)
+                if row.url_imagem:
+                    conn.execute(_UPSERT_IMAGE, (row.id, row.url_imagem, row.descricao_imagem, row.fonte_imagem))
+                else:
+                    conn.execute("DELETE FROM images WHERE question_id = ?", (row.id,))
+                if newest is None or _as_utc(row.updated_at) > newest:
+                    newest = _as_utc(row.updated_at)
+                upserted += 1
+
+            total = conn.execute("SELECT count(*) FROM questions").fetchone()[0]
+            if newest is not None:
+                _set_meta(conn, "last_updated_at", _sqlite_value(newest))
+            _set_meta(conn, "built_at", datetime.now(timezone.utc).isoformat())
+            _set_meta(conn, "question_count", total)
+            conn.commit()
+
+            if upserted or removed_ids:
+                conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('optimize')")
+                conn.commit()
+        except Exception:
+            conn.close()
+            os.remove(tmp_path)
+            raise
+        conn.close()
+
+        os.replace(tmp_path, path)
+        return {"path": path, "total": total, "upserted": upserted, "removed": len(removed_ids)}
+
+
+def search_snapshot(conn: sqlite3.Connection, query: str, limit: int = 20) -> List[sqlite3.Row]:
+    """Busca textual (sintaxe FTS5) em um snapshot aberto."""
+    # Cursor próprio: não altera o row_factory da conexão de quem chamou
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    return cursor.execute(
+        "SELECT q.* FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid "
+        "WHERE questions_fts MATCH ? ORDER BY rank LIMIT ?",
+        (query, limit),
+    ).fetchall()
@@ -1,10 +1,21 @@
+from sqlalchemy import or_, text
 from sqlalchemy.orm import Session, joinedload
-from app.models.models import Question, User
+from app.models.models import ArchivedQuestion, Question, User
 from app.schemas.schemas import QuestionCreate, QuestionUpdate, QuestionStatus
+from app.core.duplicates import duplicate_index, question_text
+from app.core.facets import FACET_FIELDS, approved_facet_index, facet_index, facet_values
+from app.core.booklet import BOOKLET_FIELDS
+from app.core.events import PROCESS_ID, publish_question_event
 from typing import List, Optional
 
-def get_question(db: Session, question_id: int):
-    return db.query(Question).options(joinedload(Question.user)).filter(Question.id == question_id).first()
+# Questões rejeitadas há mais tempo que isso vão para questions_archive
+DEFAULT_ARCHIVE_AFTER_DAYS = 180
+
+def get_question(db: Session, question_id: int, include_archived: bool = False):
+    question = db.query(Question).options(joinedload(Question.user)).filter(Question.id == question_id).first()
+    if question is None and include_archived:
+        question = db.query(ArchivedQuestion).options(joinedload(ArchivedQuestion.user)).filter(ArchivedQuestion.id == question_id).first()
+    return question
 
 def get_questions(
     db: Session, 
@@ -22,14 +33,31 @@ def get_questions(
     if status:
         query = query.filter(Question.status == status)
     if tema_principal:
-        query = query.filter(Question.tema_principal.ilike(f"%{tema_principal}%"))
+        query = query.filter(_facet_filter(Question.tema_principal, "tema_principal", tema_principal))
     if nivel_escolar:
-        query = query.filter(Question.nivel_escolar.ilike(f"%{nivel_escolar}%"))
+        query = query.filter(_facet_filter(Question.nivel_escolar, "nivel_escolar", nivel_escolar))
     
+    # Ordenação atendida pelos índices parciais de status em (created_at, id)
+    query = query.order_by(Question.created_at.desc(), Question.id.desc())
     return query.offset(skip).limit(limit).all()
 
+def _facet_filter(column, field: str, term: str):
+    # O ilike é a fonte de verdade; as grafias conhecidas no índice de facetas
+    # só acrescentam as variações de acento/caixa do termo. O índice pode
+    # estar atrasado em relação a escritas de outros processos
+    condition = column.ilike(f"%{term}%")
+    values = facet_index.matching_values(field, term)
+    if values:
+        return or_(column.in_(values), condition)
+    return condition
+
 def get_questions_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Question).options(joinedload(Question.user)).filter(Question.user_id == user_id).offset(skip).limit(limit).all()
+    return (
+        db.query(Question).options(joinedload(Question.user))
+        .filter(Question.user_id == user_id)
+        .order_by(Question.created_at.desc(), Question.id.desc())
+        .offset(skip).limit(limit).all()
+    )
 
 def create_question(db: Session, question: QuestionCreate, user_id: int):
     db_question = Question(
@@ -57,33 +85,44 @@ def create_question(db: Session, question: QuestionCreate, user_id: int):
         banca=question.banca
     )
     db.add(db_question)
+    db.flush()
+    publish_question_event(db, "question_created", db_question)
     db.commit()
     db.refresh(db_question)
+    index_question(db_question)
     return db_question
 
 def update_question(db: Session, question_id: int, question_update: QuestionUpdate):
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if db_question:
-        update_data = question_update.dict(exclude_unset=True)
+        old_status = db_question.status
+        update_data = question_update.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_question, field, value)
+        event_type = "question_status_changed" if db_question.status != old_status else "question_updated"
+        publish_question_event(db, event_type, db_question)
         db.commit()
         db.refresh(db_question)
+        index_question(db_question)
     return db_question
 
 def delete_question(db: Session, question_id: int):
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if db_question:
+        publish_question_event(db, "question_deleted", db_question)
         db.delete(db_question)
         db.commit()
+        unindex_question(question_id)
     return db_question
 
 def update_question_status(db: Session, question_id: int, status: QuestionStatus):
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if db_question:
         db_question.status = status
+        publish_question_event(db, "question_status_changed", db_question)
         db.commit()
         db.refresh(db_question)
+        index_question(db_question)
     return db_question
 
 def get_questions_count(db: Session, user_id: Optional[int] = None, status: Optional[QuestionStatus] = None):
@@ -94,8 +133,154 @@ def get_questions_count(db: Session, user_id: Optional[int] = None, status: Opti
         query = query.filter(Question.status == status)
     return query.count()
 
-def get_questions_for_export(db: Session, status: Optional[QuestionStatus] = None):
+def get_questions_for_export(db: Session, status: Optional[QuestionStatus] = None, include_archived: bool = True):
     query = db.query(Question).options(joinedload(Question.user))
     if status:
         query = query.filter(Question.status == status)
-    return query.all()
\ No newline at end of file
+    questions = query.all()
+    
+    # O arquivo morto só tem questões rejeitadas
+    if include_archived and status in (None, QuestionStatus.REJECTED):
+        archived = db.query(ArchivedQuestion).options(joinedload(ArchivedQuestion.user)).order_by(ArchivedQuestion.id).all()
+        questions.extend(archived)
+    return questions
+
+def get_questions_for_booklet(
+    db: Session,
+    question_ids: Optional[List[int]] = None,
+    status: Optional[QuestionStatus] = None,
+    tema_principal: Optional[str] = None,
+    nivel_escolar: Optional[str] = None,
+    banca: Optional[str] = None,
+    ano_questao: Optional[int] = None,
+    limit: int = 100
+):
+    """Questões do caderno como dicionários simples (enviados aos workers de renderização)."""
+    query = db.query(*[getattr(Question, field) for field in BOOKLET_FIELDS])
+    if question_ids:
+        query = query.filter(Question.id.in_(question_ids))
+    if status:
+        query = query.filter(Question.status == status)
+    if tema_principal:
+        query = query.filter(_facet_filter(Question.tema_principal, "tema_principal", tema_principal))
+    if nivel_escolar:
+        query = query.filter(_facet_filter(Question.nivel_escolar, "nivel_escolar", nivel_escolar))
+    if banca:
+        query = query.filter(_facet_filter(Question.banca, "banca", banca))
+    if ano_questao:
+        query = query.filter(Question.ano_questao == ano_questao)
+    
+    query = query.order_by(Question.id)
+    if not question_ids:
+        # Com IDs explícitos o caderno tem todas as escolhidas
+        query = query.limit(limit)
+    questions = [row._asdict() for row in query]
+    if question_ids:
+        # Mantém a ordem escolhida pelo professor
+        position = {question_id: i for i, question_id in enumerate(question_ids)}
+        questions.sort(key=lambda question: position[question["id"]])
+    return questions
+
+def archive_rejected_questions(db: Session, older_than_days: int = DEFAULT_ARCHIVE_AFTER_DAYS, batch_size: int = 500):
+    """Move questões rejeitadas antigas para questions_archive, em lotes."""
+    columns = ", ".join(column.name for column in Question.__table__.columns)
+    statement = text(f"""
+        WITH moved AS (
+            DELETE FROM questions
+            WHERE id IN (
+                SELECT id FROM questions
+                WHERE status = 'rejected' AND updated_at < now() - make_interval(days => :days)
+                ORDER BY updated_at
+                LIMIT :batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {columns}
+        )
+        INSERT INTO questions_archive ({columns}, archived_at)
+        SELECT {columns}, now() FROM moved
+        RETURNING id, user_id, status, tema_principal
+    """)
+    
+    archived_ids = []
+    while True:
+        rows = db.execute(statement, {"days": older_than_days, "batch_size": batch_size}).all()
+        # Na mesma transação do lote: os workers da API (e os clientes SSE)
+        # só ficam sabendo se o arquivamento for confirmado
+        for row in rows:
+            publish_question_event(db, "question_archived", row)
+        db.commit()
+        for row in rows:
+            unindex_question(row.id)
+        archived_ids.extend(row.id for row in rows)
+        if len(rows) < batch_size:
+            break
+    return archived_ids
+
+def index_question(db_question: Question):
+    """Atualiza os índices em memória (duplicatas e facetas) para a questão."""
+    duplicate_index.upsert(db_question.id, question_text(db_question))
+    values = facet_values(db_question)
+    facet_index.upsert(db_question.id, values)
+    if db_question.status == QuestionStatus.APPROVED:
+        approved_facet_index.upsert(db_question.id, values)
+    else:
+        approved_facet_index.discard(db_question.id)
+
+def unindex_question(question_id: int):
+    duplicate_index.discard(question_id)
+    facet_index.discard(question_id)
+    approved_facet_index.discard(question_id)
+
+def find_duplicate_questions(
+    db: Session, question, viewer: User, exclude_id: Optional[int] = None, limit: int = 10
+):
+    """Questões parecidas com ``question`` que ``viewer`` pode ver.
+
+    O índice tem questões de todos os usuários e status; quem não é admin só
+    recebe as aprovadas e as próprias, para não revelar questões não publicadas.
+    """
+    text = question_text(question)
+    if viewer.role == "admin":
+        matches = duplicate_index.query(text, exclude_id=exclude_id, limit=limit)
+    else:
+        matches = duplicate_index.query(text, exclude_id=exclude_id, limit=None)
+        if matches:
+            visible = {
+                question_id for (question_id,) in db.query(Question.id).filter(
+                    Question.id.in_([question_id for question_id, _ in matches]),
+                    or_(Question.status == QuestionStatus.APPROVED, Question.user_id == viewer.id)
+                )
+            }
+            matches = [match for match in matches if match[0] in visible][:limit]
+    return [
+        {"question_id": question_id, "similarity": round(similarity, 3)}
+        for question_id, similarity in matches
+    ]
+
+def rebuild_duplicate_index(db: Session):
+    rows = db.query(
+        Question.id, Question.enunciado, Question.alternativa_a, Question.alternativa_b,
+        Question.alternativa_c, Question.alternativa_d, Question.alternativa_e
+    ).yield_per(1000)
+    duplicate_index.rebuild((row.id, question_text(row)) for row in rows)
+
+def rebuild_facet_index(db: Session):
+    columns = [getattr(Question, field) for field in FACET_FIELDS]
+    rows = db.query(Question.id, *columns).yield_per(5000)
+    facet_index.rebuild((row.id, facet_values(row)) for row in rows)
+    rows = db.query(Question.id, *columns).filter(Question.status == QuestionStatus.APPROVED).yield_per(5000)
+    approved_facet_index.rebuild((row.id, facet_values(row)) for row in rows)
+
+def apply_question_event(db: Session, event: dict):
+    """Sincroniza os índices em memória com escritas feitas por outros processos."""
+    if event.get("origin") == PROCESS_ID:
+        return
+    question_id = event["question_id"]
+    if event["type"] in ("question_deleted", "question_archived"):
+        unindex_question(question_id)
+        return
+    db_question = db.query(Question).filter(Question.id == question_id).first()
+    if db_question is None:
+        unindex_question(question_id)
+    else:
+        index_question(db_question)
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, CheckConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import declared_attr, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -21,11 +21,15 @@ class User(Base):
         CheckConstraint("role IN ('user', 'admin')", name="check_user_role"),
     )
 
-class Question(Base):
-    __tablename__ = "questions"
+class QuestionColumns:
+    """Colunas comuns a questions e questions_archive."""
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    @declared_attr
+    def user_id(cls):
+        return Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
     data_cadastro = Column(Date, nullable=False, server_default=func.current_date())
     tema_principal = Column(String(100), nullable=False, index=True)
     subtopico = Column(String(100), nullable=False)
@@ -52,6 +56,9 @@ class Question(Base):
     status = Column(String(20), nullable=False, default="pending", index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class Question(QuestionColumns, Base):
+    __tablename__ = "questions"
     
     # Relacionamento com usuário
     user = relationship("User", back_populates="questions")
@@ -59,4 +66,12 @@ class Question(Base):
     __table_args__ = (
         CheckConstraint("resposta_correta IN ('A', 'B', 'C', 'D', 'E')", name="check_resposta_correta"),
         CheckConstraint("status IN ('pending', 'approved', 'rejected')", name="check_question_status"),
-    )
\ No newline at end of file
+    )
+
+class ArchivedQuestion(QuestionColumns, Base):
+    """Questões rejeitadas antigas, movidas para fora da tabela quente (somente leitura)."""
+    __tablename__ = "questions_archive"
+    
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    user = relationship("User")
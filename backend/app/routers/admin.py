@@ -1,18 +1,35 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import asyncio
+import json
+import os
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.core.auth import get_admin_user
+from app.core.auth import (
+    get_admin_user, get_admin_user_from_events_token, create_events_token, EVENTS_TOKEN_EXPIRE_SECONDS
+)
 from app.crud.crud_user import get_users, update_user
-from app.crud.crud_question import update_question_status, get_questions_for_export
-from app.schemas.schemas import User, UserUpdate, QuestionStatus
+from app.crud.crud_question import (
+    update_question_status, get_questions_for_export, archive_rejected_questions, DEFAULT_ARCHIVE_AFTER_DAYS,
+    get_questions_for_booklet
+)
+from app.schemas.schemas import User, UserUpdate, QuestionStatus, DuplicateCluster, BookletRequest
+from app.core.booklet import render_booklet, render_answer_key
+from app.core.duplicates import duplicate_index
+from app.core.events import question_events
+from app.core.snapshot import build_snapshot, SNAPSHOT_PATH
 from app.models.models import User as UserModel
+from app.core.responses import model_list_response
 import openpyxl
 from openpyxl.styles import Font, Alignment
 import io
 
 router = APIRouter(prefix="/admin", tags=["Administração"])
 
+# Intervalo dos comentários de keep-alive do SSE (proxies derrubam conexões ociosas)
+SSE_KEEPALIVE_SECONDS = 15
+
 @router.get("/users", response_model=List[User])
 def list_all_users(
     skip: int = 0,
@@ -21,7 +38,7 @@ def list_all_users(
     db: Session = Depends(get_db)
 ):
     """Listar todos os usuários"""
-    return get_users(db, skip=skip, limit=limit)
+    return model_list_response(User, get_users(db, skip=skip, limit=limit))
 
 @router.put("/users/{user_id}/role", response_model=User)
 def update_user_role(
@@ -49,6 +66,115 @@ def update_question_status_admin(
         raise HTTPException(status_code=404, detail="Questão não encontrada")
     return {"message": f"Status da questão atualizado para {status}", "question_id": question_id}
 
+@router.get("/questions/duplicates", response_model=List[DuplicateCluster])
+def list_duplicate_clusters(admin_user: UserModel = Depends(get_admin_user)):
+    """Listar grupos de questões quase duplicadas"""
+    return [{"question_ids": ids} for ids in duplicate_index.clusters()]
+
+@router.post("/questions/archive")
+def archive_old_rejected_questions(
+    older_than_days: int = Query(DEFAULT_ARCHIVE_AFTER_DAYS, ge=1),
+    admin_user: UserModel = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Mover questões rejeitadas antigas para o arquivo morto"""
+    archived_ids = archive_rejected_questions(db, older_than_days=older_than_days)
+    return {"message": f"{len(archived_ids)} questão(ões) arquivada(s)", "question_ids": archived_ids}
+
+@router.post("/events/token")
+def issue_events_token(admin_user: UserModel = Depends(get_admin_user)):
+    """Emitir token de curta duração para conectar em /admin/events"""
+    return {"token": create_events_token(admin_user.username), "expires_in": EVENTS_TOKEN_EXPIRE_SECONDS}
+
+@router.get("/events")
+async def stream_question_events(
+    request: Request,
+    admin_user: UserModel = Depends(get_admin_user_from_events_token)
+):
+    """Eventos em tempo real da fila de moderação (Server-Sent Events).
+
+    O token só é verificado na conexão; ao reconectar, o cliente deve pedir
+    um novo em /admin/events/token.
+    """
+    async def event_stream():
+        queue = question_events.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = {key: value for key, value in event.items() if key != "origin"}
+                yield f"event: {event['type']}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            question_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/snapshot")
+def update_snapshot(
+    admin_user: UserModel = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Atualizar (incrementalmente) o snapshot SQLite das questões aprovadas"""
+    return build_snapshot(db)
+
+@router.get("/snapshot")
+def download_snapshot(admin_user: UserModel = Depends(get_admin_user)):
+    """Baixar o último snapshot SQLite (com busca FTS5) das questões aprovadas"""
+    if not os.path.exists(SNAPSHOT_PATH):
+        raise HTTPException(
+            status_code=404,
+            detail="Snapshot ainda não gerado. Use POST /admin/snapshot ou `python manage.py snapshot`."
+        )
+    return FileResponse(
+        SNAPSHOT_PATH,
+        media_type="application/vnd.sqlite3",
+        filename="questoes_aprovadas.sqlite3"
+    )
+
+def _booklet_questions(request: BookletRequest, db: Session):
+    questions = get_questions_for_booklet(
+        db,
+        question_ids=request.question_ids,
+        status=request.status,
+        tema_principal=request.tema_principal,
+        nivel_escolar=request.nivel_escolar,
+        banca=request.banca,
+        ano_questao=request.ano_questao,
+        limit=request.limit
+    )
+    if not questions:
+        raise HTTPException(status_code=404, detail="Nenhuma questão encontrada para o caderno")
+    return questions
+
+@router.post("/booklet", response_class=HTMLResponse)
+def generate_booklet(
+    booklet: BookletRequest,
+    request: Request,
+    admin_user: UserModel = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Gerar caderno de prova imprimível (HTML) a partir de IDs ou filtros"""
+    questions = _booklet_questions(booklet, db)
+    return HTMLResponse(render_booklet(booklet.titulo, questions, base_url=str(request.base_url)))
+
+@router.post("/booklet/answer-key", response_class=HTMLResponse)
+def generate_booklet_answer_key(
+    booklet: BookletRequest,
+    admin_user: UserModel = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Gerar gabarito do caderno de prova (mesma seleção de questões)"""
+    questions = _booklet_questions(booklet, db)
+    return HTMLResponse(render_answer_key(booklet.titulo, questions))
+
 @router.get("/export/excel")
 def export_questions_excel(
     status: QuestionStatus = None,
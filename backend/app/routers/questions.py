@@ -1,14 +1,20 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.auth import get_current_active_user, get_admin_user
 from app.crud.crud_question import (
     get_question, get_questions, get_questions_by_user, create_question,
-    update_question, delete_question, update_question_status, get_questions_count
+    update_question, delete_question, update_question_status, get_questions_count,
+    find_duplicate_questions
 )
-from app.schemas.schemas import Question, QuestionCreate, QuestionUpdate, QuestionList, QuestionStatus, User
+from app.schemas.schemas import (
+    Question, QuestionCreate, QuestionUpdate, QuestionList, QuestionStatus, QuestionDuplicate,
+    FacetField, FacetValue, User
+)
+from app.core.facets import approved_facet_index, facet_index
 from app.models.models import User as UserModel
+from app.core.responses import model_response, model_list_response
 import os
 import shutil
 from uuid import uuid4
@@ -22,7 +28,18 @@ def create_new_question(
     db: Session = Depends(get_db)
 ):
     """Criar nova questão"""
-    return create_question(db=db, question=question, user_id=current_user.id)
+    db_question = create_question(db=db, question=question, user_id=current_user.id)
+    db_question.possible_duplicates = find_duplicate_questions(db, db_question, current_user, exclude_id=db_question.id)
+    return db_question
+
+@router.post("/check-duplicates", response_model=List[QuestionDuplicate])
+def check_question_duplicates(
+    question: QuestionCreate,
+    current_user: UserModel = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Listar questões parecidas com a enviada, sem cadastrá-la (útil antes de importar)"""
+    return find_duplicate_questions(db, question, current_user)
 
 @router.get("/", response_model=List[QuestionList])
 def list_questions(
@@ -36,15 +53,16 @@ def list_questions(
 ):
     """Listar questões (usuário vê apenas as suas, admin vê todas)"""
     if current_user.role == "admin":
-        return get_questions(
+        questions = get_questions(
             db, skip=skip, limit=limit, status=status,
             tema_principal=tema_principal, nivel_escolar=nivel_escolar
         )
     else:
-        return get_questions(
+        questions = get_questions(
             db, skip=skip, limit=limit, user_id=current_user.id,
             status=status, tema_principal=tema_principal, nivel_escolar=nivel_escolar
         )
+    return model_list_response(QuestionList, questions)
 
 @router.get("/my", response_model=List[QuestionList])
 def list_my_questions(
@@ -54,7 +72,8 @@ def list_my_questions(
     db: Session = Depends(get_db)
 ):
     """Listar questões do usuário logado"""
-    return get_questions_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+    questions = get_questions_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+    return model_list_response(QuestionList, questions)
 
 @router.get("/count")
 def count_questions(
@@ -70,14 +89,39 @@ def count_questions(
     
     return {"total": total}
 
+def _visible_facet_index(user: UserModel):
+    return facet_index if user.role == "admin" else approved_facet_index
+
+@router.get("/facets", response_model=Dict[str, List[FacetValue]])
+def list_facets(
+    fields: Optional[List[FacetField]] = Query(None),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Valores distintos (com contagem) de tema, subtópico, nível, banca e ano.
+
+    Admins veem todas as questões; os demais usuários, só as aprovadas.
+    """
+    selected = [field.value for field in fields] if fields else [field.value for field in FacetField]
+    return _visible_facet_index(current_user).facets(selected)
+
+@router.get("/facets/{field}/autocomplete", response_model=List[FacetValue])
+def autocomplete_facet(
+    field: FacetField,
+    prefix: str = "",
+    limit: int = Query(10, ge=1, le=50),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Sugestões de valores de uma faceta pelo prefixo digitado"""
+    return _visible_facet_index(current_user).complete(field.value, prefix, limit=limit)
+
 @router.get("/{question_id}", response_model=Question)
 def get_question_detail(
     question_id: int,
     current_user: UserModel = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Obter detalhes de uma questão"""
-    question = get_question(db, question_id=question_id)
+    """Obter detalhes de uma questão (inclusive arquivadas)"""
+    question = get_question(db, question_id=question_id, include_archived=True)
     if question is None:
         raise HTTPException(status_code=404, detail="Questão não encontrada")
     
@@ -85,7 +129,8 @@ def get_question_detail(
     if current_user.role != "admin" and question.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    return question
+    question.possible_duplicates = find_duplicate_questions(db, question, current_user, exclude_id=question.id)
+    return model_response(Question, question)
 
 @router.put("/{question_id}", response_model=Question)
 def update_question_detail(
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
+from typing import Optional, List, Union
 from datetime import date, datetime
 from enum import Enum
 
@@ -12,6 +12,13 @@ class QuestionStatus(str, Enum):
     APPROVED = "approved"
     REJECTED = "rejected"
 
+class FacetField(str, Enum):
+    TEMA_PRINCIPAL = "tema_principal"
+    SUBTOPICO = "subtopico"
+    NIVEL_ESCOLAR = "nivel_escolar"
+    BANCA = "banca"
+    ANO_QUESTAO = "ano_questao"
+
 class RespostaCorreta(str, Enum):
     A = "A"
     B = "B"
@@ -28,7 +35,8 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
     
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
         if len(v) < 6:
             raise ValueError('A senha deve ter pelo menos 6 caracteres')
@@ -41,11 +49,12 @@ class UserUpdate(BaseModel):
 
 class User(UserBase):
     id: int
+    # Já validado no cadastro; evita rodar o email-validator em cada resposta
+    email: str
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schemas para Question
 class QuestionBase(BaseModel):
@@ -71,13 +80,15 @@ class QuestionBase(BaseModel):
     ano_questao: Optional[int] = None
     banca: Optional[str] = None
     
-    @validator('tema_principal', 'subtopico', 'enunciado', 'tipo_questao', 'nivel_escolar')
+    @field_validator('tema_principal', 'subtopico', 'enunciado', 'tipo_questao', 'nivel_escolar')
+    @classmethod
     def validate_required_fields(cls, v):
         if not v or not v.strip():
             raise ValueError('Este campo é obrigatório e não pode estar vazio')
         return v.strip()
     
-    @validator('alternativa_a', 'alternativa_b', 'alternativa_c', 'alternativa_d', 'alternativa_e', 'texto_alternativa_correta')
+    @field_validator('alternativa_a', 'alternativa_b', 'alternativa_c', 'alternativa_d', 'alternativa_e', 'texto_alternativa_correta')
+    @classmethod
     def validate_alternatives(cls, v):
         if not v or not v.strip():
             raise ValueError('Todas as alternativas são obrigatórias')
@@ -110,6 +121,13 @@ class QuestionUpdate(BaseModel):
     ano_questao: Optional[int] = None
     banca: Optional[str] = None
 
+class QuestionDuplicate(BaseModel):
+    question_id: int
+    similarity: float
+
+class DuplicateCluster(BaseModel):
+    question_ids: List[int]
+
 class Question(QuestionBase):
     id: int
     user_id: int
@@ -123,8 +141,10 @@ class Question(QuestionBase):
     ano_questao: Optional[int] = None
     banca: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    # Possíveis duplicatas (índice MinHash), preenchidas na criação e no detalhe
+    possible_duplicates: List[QuestionDuplicate] = []
+    
+    model_config = ConfigDict(from_attributes=True)
 
 class QuestionList(BaseModel):
     id: int
@@ -140,11 +160,27 @@ class QuestionList(BaseModel):
     url_imagem: Optional[str] = None
     descricao_imagem: Optional[str] = None
     fonte_imagem: Optional[str] = None
-    ano_questao: Optional[int] = None
-    banca: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+# Schemas para facetas/autocomplete
+class FacetValue(BaseModel):
+    value: Union[int, str]
+    count: int
+
+# Schemas para caderno de prova
+MAX_BOOKLET_QUESTIONS = 200
+
+class BookletRequest(BaseModel):
+    titulo: str = "Avaliação de Geografia"
+    # Lista explícita: todas as questões, na ordem dada (``limit`` não se aplica)
+    question_ids: Optional[List[int]] = Field(None, max_length=MAX_BOOKLET_QUESTIONS)
+    status: Optional[QuestionStatus] = None
+    tema_principal: Optional[str] = None
+    nivel_escolar: Optional[str] = None
+    banca: Optional[str] = None
+    ano_questao: Optional[int] = None
+    limit: int = Field(100, ge=1, le=MAX_BOOKLET_QUESTIONS)
 
 # Schemas para autenticação
 class Token(BaseModel):
@@ -0,0 +1,102 @@
+"""Benchmark de serialização de uma página de ``List[QuestionList]``.
+
+Compara o caminho antigo (validar cada linha, converter em dict com
+``jsonable_encoder`` e codificar com ``json``) com o caminho rápido de
+``app.core.responses`` (``TypeAdapter`` direto para bytes). O caminho antigo
+usa cópias dos schemas como eram antes, com ``email: EmailStr`` na saída.
+
+Uso, a partir de backend/:
+    python -m benchmarks.bench_serialization [--rows 100] [--repeat 500]
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.compression import brotli, compress
+from app.core.responses import model_list_response
+from app.schemas.schemas import QuestionList, User, UserBase
+
+
+class LegacyUser(UserBase):
+    """``User`` de saída antes da otimização (valida ``EmailStr`` em cada linha)."""
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = User.model_config
+
+
+class LegacyQuestionList(QuestionList):
+    user: LegacyUser
+
+
+def make_rows(count: int):
+    now = datetime.now(timezone.utc)
+    user = SimpleNamespace(
+        id=1, username="professor", email="professor@legidepe.com", role="user",
+        created_at=now, updated_at=now,
+    )
+    return [
+        SimpleNamespace(
+            id=i,
+            tema_principal="Geografia Física",
+            subtopico="Climatologia",
+            enunciado="Analise o climograma e assinale a alternativa correta sobre o clima tropical. " * 4,
+            nivel_escolar="Ensino Médio",
+            status="approved",
+            created_at=now,
+            user=user,
+            ano_questao=2023,
+            banca="ENEM",
+            url_imagem=f"/uploads/{i}.png",
+            descricao_imagem="Climograma de Cuiabá",
+            fonte_imagem="INMET",
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_serialize(rows) -> bytes:
+    validated = [LegacyQuestionList.model_validate(row, from_attributes=True) for row in rows]
+    content = jsonable_encoder(validated)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_serialize(rows) -> bytes:
+    return model_list_response(QuestionList, rows).body
+
+
+def cpu_per_call(func, rows, repeat: int) -> float:
+    func(rows)  # aquecimento
+    start = time.process_time()
+    for _ in range(repeat):
+        func(rows)
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    legacy = cpu_per_call(legacy_serialize, rows, args.repeat)
+    fast = cpu_per_call(fast_serialize, rows, args.repeat)
+    body = fast_serialize(rows)
+
+    print(f"Página com {args.rows} linhas ({len(body)} bytes)")
+    print(f"  antes  (jsonable_encoder + json): {legacy * 1000:.3f} ms CPU")
+    print(f"  depois (TypeAdapter.dump_json):   {fast * 1000:.3f} ms CPU  ({legacy / fast:.1f}x)")
+    print(f"  gzip: {len(gzip.compress(body, compresslevel=5))} bytes")
+    if brotli is not None:
+        print(f"  brotli: {len(compress(body, 'br'))} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,92 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+import threading
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.routers import auth, questions, admin
-from app.core.database import engine
-from app.models import models
+from app.core.compression import CompressionMiddleware
+from app.core.responses import ORJSONResponse
+from app.core.rate_limit import AdmissionControlMiddleware, backend_from_env
+from app.core.auth import SECRET_KEY, ALGORITHM
+from app.core.database import SessionLocal, engine, POOL_SIZE, MAX_OVERFLOW
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core.events import QuestionEventListener, question_events
+from app.core.booklet import shutdown_pool as shutdown_booklet_pool
+from app.crud.crud_question import apply_question_event, rebuild_duplicate_index, rebuild_facet_index
 import os
 
-# Criar tabelas se não existirem
-models.Base.metadata.create_all(bind=engine)
+# O esquema do banco é gerenciado por migrações: rode `python manage.py migrate`
+
+# Confiança em proxies reversos para identificar o IP do cliente (rate limit).
+# TRUSTED_PROXY_HOPS: proxies na frente da aplicação cujo X-Forwarded-For é
+# lido pelo rate limit (no Railway, 1). FORWARDED_ALLOW_IPS: IPs dos proxies
+# em que o uvicorn confia para reescrever o endereço do cliente. Atrás de um
+# proxy, configure um dos dois; sem isso todos os clientes anônimos dividem o
+# bucket do IP do proxy
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS")
+
+def load_indexes():
+    db = SessionLocal()
+    try:
+        for name, rebuild in (("facetas", rebuild_facet_index), ("duplicatas", rebuild_duplicate_index)):
+            try:
+                rebuild(db)
+            except Exception as e:
+                db.rollback()
+                print(f"Erro ao carregar índice de {name}: {e}")
+    finally:
+        db.close()
+
+def sync_indexes(event: dict):
+    db = SessionLocal()
+    try:
+        apply_question_event(db, event)
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Uma única conexão LISTEN por processo alimenta o SSE e os índices
+    question_events.bind_loop(asyncio.get_running_loop())
+    question_events.add_listener(sync_indexes)
+    listener = QuestionEventListener(engine)
+    listener.start()
+
+    if TRUSTED_PROXY_HOPS == 0 and not FORWARDED_ALLOW_IPS:
+        print(
+            "AVISO: TRUSTED_PROXY_HOPS e FORWARDED_ALLOW_IPS não configurados; "
+            "atrás de um proxy, o rate limit trata todos os clientes anônimos como um só IP"
+        )
+
+    # Índices em memória montados em segundo plano para não atrasar o startup
+    threading.Thread(target=load_indexes, name="question-indexes", daemon=True).start()
+    yield
+
+    listener.stop()
+    shutdown_booklet_pool()
 
 # Criar aplicação FastAPI
 app = FastAPI(
     title="Sistema de Questões de Geografia - Laboratório Legidepe",
     description="API para cadastro e gerenciamento de questões de geografia",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Rate limit por usuário/IP e descarte de carga (dentro do CORS, para que
+# as respostas 429/503 cheguem legíveis ao navegador)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    secret_key=SECRET_KEY,
+    algorithm=ALGORITHM,
+    backend=backend_from_env(),
+    max_in_flight=int(os.getenv("MAX_IN_FLIGHT_REQUESTS", "64")),
+    engine=engine,
+    max_db_connections=POOL_SIZE + MAX_OVERFLOW,
+    trusted_proxy_hops=TRUSTED_PROXY_HOPS
 )
 
 # CORRIGIR CORS - MAIS ESPECÍFICO
@@ -25,6 +98,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir (brotli/gzip) respostas maiores que o limite
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+)
+
+@app.exception_handler(PoolTimeoutError)
+def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Esperou DB_POOL_TIMEOUT segundos por uma conexão do pool
+    return ORJSONResponse(
+        {"detail": "Servidor sobrecarregado. Tente novamente em instantes."},
+        status_code=503,
+        headers={"Retry-After": "2"}
+    )
+
 # Criar diretório de uploads se não existir
 os.makedirs("uploads", exist_ok=True)
 
@@ -51,4 +139,10 @@ def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS or "127.0.0.1"
+    )
\ No newline at end of file
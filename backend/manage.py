@@ -0,0 +1,77 @@
+"""Comandos administrativos do backend.
+
+Uso:
+    python manage.py migrate          # aplica as migrações pendentes
+    python manage.py migrate --status # mostra o estado das migrações
+    python manage.py archive          # arquiva questões rejeitadas antigas
+    python manage.py snapshot         # atualiza o snapshot SQLite das aprovadas
+"""
+import argparse
+import sys
+
+from app.core.database import engine, SessionLocal
+from app.core.migrations import get_status, run_migrations
+from app.core.snapshot import build_snapshot, SNAPSHOT_PATH
+from app.crud.crud_question import archive_rejected_questions, DEFAULT_ARCHIVE_AFTER_DAYS
+
+
+def migrate(args):
+    if args.status:
+        for migration, applied, checksum_ok in get_status(engine):
+            state = "aplicada" if applied else "pendente"
+            if not checksum_ok:
+                state += " (alterada após aplicação)"
+            print(f"{migration.version:04d}_{migration.name}: {state}")
+        return
+
+    applied = run_migrations(engine)
+    if not applied:
+        print("Banco de dados já está atualizado.")
+    else:
+        print(f"{len(applied)} migração(ões) aplicada(s).")
+
+
+def archive(args):
+    db = SessionLocal()
+    try:
+        archived_ids = archive_rejected_questions(db, older_than_days=args.days, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"{len(archived_ids)} questão(ões) rejeitada(s) arquivada(s).")
+
+
+def snapshot(args):
+    db = SessionLocal()
+    try:
+        result = build_snapshot(db, path=args.path)
+    finally:
+        db.close()
+    print(
+        f"Snapshot {result['path']}: {result['total']} questões "
+        f"({result['upserted']} atualizada(s), {result['removed']} removida(s))."
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comandos administrativos do backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Aplicar migrações do banco de dados")
+    migrate_parser.add_argument("--status", action="store_true", help="Apenas listar o estado das migrações")
+    migrate_parser.set_defaults(func=migrate)
+
+    archive_parser = subparsers.add_parser("archive", help="Arquivar questões rejeitadas antigas")
+    archive_parser.add_argument("--days", type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS, help="Idade mínima (dias desde a última alteração)")
+    archive_parser.add_argument("--batch-size", type=int, default=500)
+    archive_parser.set_defaults(func=archive)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="Gerar/atualizar o snapshot SQLite das questões aprovadas")
+    snapshot_parser.add_argument("--path", default=SNAPSHOT_PATH, help="Arquivo do snapshot")
+    snapshot_parser.set_defaults(func=snapshot)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+-- Esquema inicial do sistema de questões de geografia.
+--
+-- Idempotente: bancos criados antes do subsistema de migrações (via
+-- setup_database.sql ou Base.metadata.create_all) são apenas completados.
+-- Os nomes dos índices seguem os gerados pelo SQLAlchemy (ix_<tabela>_<coluna>).
+-- Os índices de questions, tabela já populada nesses bancos, são criados na
+-- migração 0002, sem bloquear escritas.
+
+-- Tabela de usuários
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) NOT NULL,
+    email VARCHAR(100) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    role VARCHAR(20) NOT NULL DEFAULT 'user',
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    CONSTRAINT check_user_role CHECK (role IN ('user', 'admin'))
+);
+
+CREATE INDEX IF NOT EXISTS ix_users_id ON users (id);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username ON users (username);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email);
+
+-- Restrições UNIQUE do antigo setup_database.sql, redundantes com os índices acima
+ALTER TABLE users DROP CONSTRAINT IF EXISTS users_username_key;
+ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key;
+
+-- Tabela de questões
+CREATE TABLE IF NOT EXISTS questions (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    data_cadastro DATE NOT NULL DEFAULT CURRENT_DATE,
+    tema_principal VARCHAR(100) NOT NULL,
+    subtopico VARCHAR(100) NOT NULL,
+    enunciado TEXT NOT NULL,
+    tipo_questao VARCHAR(50) NOT NULL,
+    url_imagem VARCHAR(255),
+    descricao_imagem TEXT,
+    fonte_imagem VARCHAR(255),
+    nivel_escolar VARCHAR(50) NOT NULL,
+    alternativa_a TEXT NOT NULL,
+    alternativa_b TEXT NOT NULL,
+    alternativa_c TEXT NOT NULL,
+    alternativa_d TEXT NOT NULL,
+    alternativa_e TEXT NOT NULL,
+    resposta_correta VARCHAR(1) NOT NULL,
+    texto_alternativa_correta TEXT NOT NULL,
+    dica TEXT,
+    fonte_bibliografica TEXT,
+    ano_questao INTEGER,
+    banca VARCHAR(100),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    CONSTRAINT check_resposta_correta CHECK (resposta_correta IN ('A', 'B', 'C', 'D', 'E')),
+    CONSTRAINT check_question_status CHECK (status IN ('pending', 'approved', 'rejected'))
+);
+
+-- Colunas que faltavam em bancos criados pelo setup_database.sql
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS ano_questao INTEGER;
+ALTER TABLE questions ADD COLUMN IF NOT EXISTS banca VARCHAR(100);
+
+-- Questões são removidas junto com o autor (como no setup_database.sql e em
+-- questions_archive). Bancos criados pelo create_all não tinham o CASCADE; a
+-- restrição é recriada como NOT VALID (sem varrer a tabela) e validada na 0002
+ALTER TABLE questions DROP CONSTRAINT IF EXISTS questions_user_id_fkey;
+ALTER TABLE questions
+    ADD CONSTRAINT questions_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE NOT VALID;
+
+-- Função para atualizar o campo updated_at automaticamente
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers para atualizar updated_at
+DROP TRIGGER IF EXISTS update_users_updated_at ON users;
+CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_questions_updated_at ON questions;
+CREATE TRIGGER update_questions_updated_at BEFORE UPDATE ON questions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
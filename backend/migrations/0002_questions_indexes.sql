@@ -0,0 +1,25 @@
+-- migrate:no-transaction
+-- Índices de questions criados sem bloquear escritas na tabela, que já pode
+-- estar populada (bancos criados pelo antigo setup_database.sql).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_id ON questions (id);
+-- migrate:statement
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_tema_principal ON questions (tema_principal);
+-- migrate:statement
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_nivel_escolar ON questions (nivel_escolar);
+-- migrate:statement
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_status ON questions (status);
+-- migrate:statement
+-- Listagens "minhas questões" e filtro por usuário
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_user_id ON questions (user_id);
+-- migrate:statement
+-- Índices do antigo setup_database.sql, substituídos pelos ix_* acima
+DROP INDEX CONCURRENTLY IF EXISTS idx_questions_user_id;
+-- migrate:statement
+DROP INDEX CONCURRENTLY IF EXISTS idx_questions_status;
+-- migrate:statement
+DROP INDEX CONCURRENTLY IF EXISTS idx_questions_tema_principal;
+-- migrate:statement
+DROP INDEX CONCURRENTLY IF EXISTS idx_questions_nivel_escolar;
+-- migrate:statement
+-- Valida a chave estrangeira recriada na 0001 (não bloqueia escritas)
+ALTER TABLE questions VALIDATE CONSTRAINT questions_user_id_fkey;
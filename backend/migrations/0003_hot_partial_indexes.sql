@@ -0,0 +1,13 @@
+-- migrate:no-transaction
+-- Índices parciais para os predicados quentes: fila de moderação (pending)
+-- e navegação de questões aprovadas, ambos ordenados por data de criação.
+-- Linhas rejeitadas não entram nesses índices; o último atende apenas ao
+-- job de arquivamento.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_pending_created_at
+    ON questions (created_at, id) WHERE status = 'pending';
+-- migrate:statement
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_approved_created_at
+    ON questions (created_at, id) WHERE status = 'approved';
+-- migrate:statement
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_rejected_updated_at
+    ON questions (updated_at) WHERE status = 'rejected';
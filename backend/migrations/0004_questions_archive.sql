@@ -0,0 +1,15 @@
+-- Arquivo morto para questões rejeitadas antigas, fora da tabela quente.
+-- Preenchido por `python manage.py archive`. Ao adicionar colunas em
+-- questions, adicione-as também aqui.
+CREATE TABLE questions_archive (LIKE questions INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+
+-- O id vem da tabela de origem; não consumir a sequência de questions
+ALTER TABLE questions_archive ALTER COLUMN id DROP DEFAULT;
+ALTER TABLE questions_archive ADD PRIMARY KEY (id);
+ALTER TABLE questions_archive
+    ADD CONSTRAINT questions_archive_user_id_fkey
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE;
+ALTER TABLE questions_archive ADD COLUMN archived_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE INDEX ix_questions_archive_user_id ON questions_archive (user_id);
+CREATE INDEX ix_questions_archive_archived_at ON questions_archive (archived_at);
@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding, parse_accept_encoding
+
+BODY = b'{"dados": "' + b"x" * 4000 + b'"}'
+
+
+def test_parse_accept_encoding_q_values():
+    assert parse_accept_encoding("gzip;q=0.8, br, *;q=0") == {"gzip": 0.8, "br": 1.0, "*": 0.0}
+    assert parse_accept_encoding(" GZIP ; q=0.5 ,, ") == {"gzip": 0.5}
+    # q inválido conta como recusado
+    assert parse_accept_encoding("gzip;q=abc") == {"gzip": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("*;q=0, gzip", "gzip"),
+        ("", None),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def make_client(minimum_size=1024):
+    app = FastAPI()
+
+    @app.get("/json")
+    def json_body():
+        return Response(BODY, media_type="application/json")
+
+    @app.get("/small")
+    def small_body():
+        return Response(b"{}", media_type="application/json")
+
+    @app.get("/xlsx")
+    def xlsx_body():
+        return Response(BODY, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    @app.get("/stream")
+    def stream_body():
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/json")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return TestClient(app)
+
+
+def test_compresses_large_json_with_gzip():
+    response = make_client().get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.content == BODY  # httpx descomprime
+
+
+@pytest.mark.parametrize("path", ["/small", "/xlsx", "/stream"])
+def test_passthrough(path):
+    response = make_client().get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_no_accepted_encoding_passes_through():
+    response = make_client().get("/json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY
+
+
+def test_gzip_round_trip():
+    assert gzip.decompress(compression.compress(BODY, "gzip")) == BODY
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.duplicates import DuplicateIndex, normalize_text, question_text
+
+BASE = (
+    "Analise o climograma de Cuiabá e assinale a alternativa correta sobre o clima "
+    "tropical continental, com verões chuvosos e invernos secos na região Centro-Oeste"
+)
+NEAR = BASE + " do Brasil"
+OTHER = "Sobre a formação do relevo brasileiro, os planaltos e as depressões resultam de processos erosivos antigos"
+
+
+def test_normalize_text_ignores_accents_case_and_punctuation():
+    assert normalize_text("Clima TROPICAL, úmido; é isso!") == ["clima", "tropical", "umido", "e", "isso"]
+    assert normalize_text(None) == []
+
+
+def test_question_text_joins_statement_and_alternatives():
+    question = SimpleNamespace(
+        enunciado="Enunciado", alternativa_a="A", alternativa_b=None,
+        alternativa_c="C", alternativa_d="D", alternativa_e="E",
+    )
+    assert question_text(question) == "Enunciado A  C D E"
+
+
+def test_num_perm_must_be_multiple_of_bands():
+    with pytest.raises(ValueError):
+        DuplicateIndex(num_perm=10, bands=3)
+
+
+def test_signature_edge_cases():
+    index = DuplicateIndex()
+    assert index.signature("") is None
+    assert index.signature("!!! ...") is None
+    # Menos palavras que o shingle: o texto inteiro vira um shingle
+    assert index.signature("duas palavras") == index.signature("Duas, PALAVRAS!")
+    assert len(index.signature(BASE)) == 64
+
+
+def test_band_keys_partition_the_signature():
+    index = DuplicateIndex(num_perm=8, bands=4)
+    signature = tuple(range(8))
+    assert list(index._band_keys(signature)) == [(0, (0, 1)), (1, (2, 3)), (2, (4, 5)), (3, (6, 7))]
+
+
+def test_query_finds_near_duplicates_only():
+    index = DuplicateIndex()
+    index.upsert(1, BASE)
+    index.upsert(2, NEAR)
+    index.upsert(3, OTHER)
+
+    matches = index.query(BASE.upper())
+    assert [question_id for question_id, _ in matches] == [1, 2]
+    assert matches[0][1] == 1.0
+    assert index.query(BASE, exclude_id=1)[0][0] == 2
+    assert len(index.query(BASE, limit=1)) == 1
+    assert len(index.query(BASE, limit=None)) == 2
+    assert index.query("") == []
+
+
+def test_candidates_below_threshold_are_dropped():
+    index = DuplicateIndex(threshold=1.0)
+    index.upsert(1, BASE)
+    index.upsert(2, NEAR)
+    assert [question_id for question_id, _ in index.query(BASE)] == [1]
+
+
+def test_upsert_replaces_and_discard_cleans_buckets():
+    index = DuplicateIndex()
+    index.upsert(1, BASE)
+    index.upsert(1, OTHER)
+    assert index.query(BASE) == []
+    assert index.query(OTHER)[0][0] == 1
+
+    index.discard(1)
+    index.discard(1)  # idempotente
+    assert len(index) == 0
+    assert not index._buckets
+
+
+def test_upsert_with_empty_text_removes_question():
+    index = DuplicateIndex()
+    index.upsert(1, BASE)
+    index.upsert(1, "")
+    assert len(index) == 0
+
+
+def test_rebuild_replays_writes_made_during_rebuild():
+    index = DuplicateIndex()
+    index.upsert(9, OTHER)
+
+    def rows():
+        yield 1, BASE
+        # Escritas concorrentes enquanto o banco é lido
+        index.upsert(2, NEAR)
+        index.discard(3)
+        index.upsert(1, OTHER)
+        yield 3, BASE
+
+    index.rebuild(rows())
+    assert sorted(index._signatures) == [1, 2]
+    # A versão de 1 escrita durante o rebuild vence a lida do banco
+    assert index.query(OTHER)[0][0] == 1
+    assert index._touched is None
+
+
+def test_failed_rebuild_keeps_index_and_stops_tracking():
+    index = DuplicateIndex()
+    index.upsert(1, BASE)
+
+    def rows():
+        yield 2, NEAR
+        raise RuntimeError("conexão perdida")
+
+    with pytest.raises(RuntimeError):
+        index.rebuild(rows())
+    assert index._touched is None
+    assert index.query(BASE)[0][0] == 1
+
+
+def test_clusters_group_connected_near_duplicates():
+    index = DuplicateIndex()
+    index.upsert(5, NEAR)
+    index.upsert(1, BASE)
+    index.upsert(3, BASE)
+    index.upsert(7, OTHER)
+    index.upsert(8, OTHER)
+    index.upsert(9, "texto completamente diferente de todos os outros acima")
+    assert index.clusters() == [[1, 3, 5], [7, 8]]
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.facets import FACET_FIELDS, FacetIndex, facet_values, normalize_value
+
+
+def values(tema=None, subtopico=None, nivel=None, banca=None, ano=None):
+    return (tema, subtopico, nivel, banca, ano)
+
+
+def test_normalize_value():
+    assert normalize_value("  Geografia   Física ") == "geografia fisica"
+    assert normalize_value(2023) == "2023"
+
+
+def test_facet_values_follow_field_order():
+    question = SimpleNamespace(tema_principal="T", subtopico="S", nivel_escolar="N", banca="B", ano_questao=2020)
+    assert facet_values(question) == ("T", "S", "N", "B", 2020)
+    assert len(FACET_FIELDS) == 5
+
+
+def test_spelling_variants_are_grouped_under_most_used():
+    index = FacetIndex()
+    index.upsert(1, values(tema="Geografia Física"))
+    index.upsert(2, values(tema="geografia fisica"))
+    index.upsert(3, values(tema="Geografia Física"))
+    index.upsert(4, values(tema="Cartografia"))
+    assert index.facets(["tema_principal"]) == {
+        "tema_principal": [
+            {"value": "Geografia Física", "count": 3},
+            {"value": "Cartografia", "count": 1},
+        ]
+    }
+
+
+def test_empty_and_none_values_are_ignored():
+    index = FacetIndex()
+    index.upsert(1, values(tema="", banca=None, ano=0))
+    assert index.facets() == {field: [] for field in FACET_FIELDS} | {"ano_questao": [{"value": 0, "count": 1}]}
+
+
+def test_upsert_moves_counts_and_remove_cleans_keys():
+    index = FacetIndex()
+    index.upsert(1, values(tema="Clima"))
+    index.upsert(2, values(tema="Clima"))
+    index.upsert(1, values(tema="Relevo"))
+    assert index.facets(["tema_principal"])["tema_principal"] == [
+        {"value": "Clima", "count": 1},
+        {"value": "Relevo", "count": 1},
+    ]
+
+    index.discard(2)
+    index.discard(2)  # idempotente
+    index.discard(99)
+    assert index._keys["tema_principal"] == ["relevo"]
+    assert "clima" not in index._variants["tema_principal"]
+
+
+def test_removing_one_variant_keeps_the_others():
+    index = FacetIndex()
+    index.upsert(1, values(tema="Clima"))
+    index.upsert(2, values(tema="CLIMA"))
+    index.discard(1)
+    assert index.facets(["tema_principal"])["tema_principal"] == [{"value": "CLIMA", "count": 1}]
+
+
+def test_complete_by_normalized_prefix():
+    index = FacetIndex()
+    for question_id, tema in enumerate(["Geografia Física", "Geografia Humana", "Geografia Humana", "Geologia", "Hidrografia"]):
+        index.upsert(question_id, values(tema=tema))
+    assert index.complete("tema_principal", "GEOGRAFIA") == [
+        {"value": "Geografia Humana", "count": 2},
+        {"value": "Geografia Física", "count": 1},
+    ]
+    assert [entry["value"] for entry in index.complete("tema_principal", "geo", limit=1)] == ["Geografia Humana"]
+    assert index.complete("tema_principal", "zzz") == []
+    # Prefixo vazio lista tudo
+    assert len(index.complete("tema_principal", "")) == 4
+
+
+def test_matching_values_requires_ready_index():
+    index = FacetIndex()
+    index.upsert(1, values(tema="Geografia Física"))
+    assert index.matching_values("tema_principal", "fisica") is None
+
+    index.rebuild([(1, values(tema="Geografia Física")), (2, values(tema="geografia fisica"))])
+    assert sorted(index.matching_values("tema_principal", "FÍSICA")) == ["Geografia Física", "geografia fisica"]
+    assert index.matching_values("tema_principal", "humana") == []
+
+
+def test_rebuild_replays_writes_made_during_rebuild():
+    index = FacetIndex()
+
+    def rows():
+        yield 1, values(tema="Clima")
+        index.upsert(1, values(tema="Relevo"))
+        index.upsert(2, values(tema="Solos"))
+        index.discard(3)
+        yield 3, values(tema="Clima")
+
+    index.rebuild(rows())
+    assert index.ready
+    assert sorted(entry["value"] for entry in index.facets(["tema_principal"])["tema_principal"]) == ["Relevo", "Solos"]
+    assert index._touched is None
+
+
+def test_failed_rebuild_stops_tracking_and_stays_not_ready():
+    index = FacetIndex()
+
+    def rows():
+        yield 1, values(tema="Clima")
+        raise RuntimeError("conexão perdida")
+
+    with pytest.raises(RuntimeError):
+        index.rebuild(rows())
+    assert index._touched is None
+    assert not index.ready
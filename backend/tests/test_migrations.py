@@ -0,0 +1,63 @@
+import pytest
+
+from app.core.migrations import MIGRATIONS_DIR, Migration, load_migrations
+
+
+def test_transactional_depends_on_marker():
+    assert Migration(1, "a", "CREATE TABLE t (id int);").transactional
+    assert not Migration(2, "b", "-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY i ON t (id);").transactional
+    # O marcador só vale na primeira linha
+    assert Migration(3, "c", "SELECT 1;\n-- migrate:no-transaction\n").transactional
+
+
+def test_statements_split_on_separator_only():
+    sql = """-- migrate:no-transaction
+-- comentário inicial
+CREATE FUNCTION f() RETURNS trigger AS $$
+BEGIN
+    NEW.nome = 'a;b';
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+-- migrate:statement
+CREATE INDEX CONCURRENTLY i ON t (id);
+"""
+    statements = Migration(1, "a", sql).statements()
+    assert len(statements) == 2
+    assert "NEW.nome = 'a;b';" in statements[0]
+    assert statements[0].rstrip().endswith("LANGUAGE plpgsql;")
+    assert statements[1] == "CREATE INDEX CONCURRENTLY i ON t (id);"
+
+
+def test_statements_skip_comment_only_chunks():
+    sql = "-- migrate:no-transaction\n-- só comentário\n-- migrate:statement\n\nSELECT 1;\n-- migrate:statement\n   \n"
+    assert Migration(1, "a", sql).statements() == ["SELECT 1;"]
+
+
+def test_statements_without_separator_is_single_statement():
+    sql = "-- migrate:no-transaction\nCREATE INDEX CONCURRENTLY a ON t (x);\nCREATE INDEX CONCURRENTLY b ON t (y);"
+    assert len(Migration(1, "a", sql).statements()) == 1
+
+
+def test_checksum_changes_with_content():
+    assert Migration(1, "a", "SELECT 1;").checksum != Migration(1, "a", "SELECT 2;").checksum
+
+
+def test_load_migrations_orders_and_rejects_duplicates(tmp_path):
+    (tmp_path / "0002_b.sql").write_text("SELECT 2;", encoding="utf-8")
+    (tmp_path / "0001_a.sql").write_text("SELECT 1;", encoding="utf-8")
+    (tmp_path / "leia-me.txt").write_text("ignorado", encoding="utf-8")
+    assert [(m.version, m.name) for m in load_migrations(str(tmp_path))] == [(1, "a"), (2, "b")]
+
+    (tmp_path / "0002_c.sql").write_text("SELECT 3;", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        load_migrations(str(tmp_path))
+
+
+def test_repository_no_transaction_scripts_have_one_command_per_statement():
+    for migration in load_migrations(MIGRATIONS_DIR):
+        if migration.transactional:
+            continue
+        for statement in migration.statements():
+            code = [line for line in statement.splitlines() if line.strip() and not line.strip().startswith("--")]
+            assert "".join(code).count(";") == 1, (migration.name, statement)
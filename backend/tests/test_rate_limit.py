@@ -0,0 +1,203 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import rate_limit
+from app.core.rate_limit import (
+    AdmissionControlMiddleware, Budget, MemoryBackend, classify_request, client_identity, pool_saturated,
+)
+
+SECRET = "segredo"
+ALGORITHM = "HS256"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def take(backend, key, budget, cost=1.0):
+    return asyncio.run(backend.take(key, budget, cost))
+
+
+def test_bucket_allows_burst_then_reports_wait(clock):
+    backend = MemoryBackend()
+    budget = Budget(rate=2.0, capacity=3)
+    assert [take(backend, "k", budget) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert take(backend, "k", budget) == pytest.approx(0.5)
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    backend = MemoryBackend()
+    budget = Budget(rate=1.0, capacity=2)
+    take(backend, "k", budget)
+    take(backend, "k", budget)
+    clock.now += 1.0
+    assert take(backend, "k", budget) == 0.0
+    assert take(backend, "k", budget) == pytest.approx(1.0)
+
+    # Parado por muito tempo, não acumula além da capacidade
+    clock.now += 100
+    assert [take(backend, "k", budget) for _ in range(2)] == [0.0, 0.0]
+    assert take(backend, "k", budget) > 0
+
+
+def test_rejected_request_does_not_consume_tokens(clock):
+    backend = MemoryBackend()
+    budget = Budget(rate=1.0, capacity=1)
+    take(backend, "k", budget)
+    take(backend, "k", budget)
+    take(backend, "k", budget)
+    clock.now += 1.0
+    assert take(backend, "k", budget) == 0.0
+
+
+def test_buckets_are_independent_per_key(clock):
+    backend = MemoryBackend()
+    budget = Budget(rate=1.0, capacity=1)
+    assert take(backend, "a", budget) == 0.0
+    assert take(backend, "b", budget) == 0.0
+    assert take(backend, "a", budget) > 0
+
+
+def test_eviction_drops_oldest_buckets(clock):
+    backend = MemoryBackend(max_keys=4)
+    budget = Budget(rate=1.0, capacity=5)
+    for i in range(5):
+        clock.now += 1
+        take(backend, f"k{i}", budget)
+    # Ao passar de max_keys, metade dos buckets (os mais antigos) sai
+    assert sorted(backend._buckets) == ["k2", "k3", "k4"]
+
+
+@pytest.mark.parametrize(
+    "method, path, category",
+    [
+        ("POST", "/auth/login", "auth"),
+        ("GET", "/admin/export/excel", "export"),
+        ("POST", "/admin/booklet", "export"),
+        ("GET", "/admin/snapshot", "export"),
+        ("DELETE", "/questions/1", "write"),
+        ("PUT", "/questions/1", "write"),
+        ("GET", "/questions/", "read"),
+    ],
+)
+def test_classify_request(method, path, category):
+    assert classify_request(method, path) == category
+
+
+def scope(headers=(), client=("10.0.0.1", 1234)):
+    return {"headers": [(name.lower().encode(), value.encode()) for name, value in headers], "client": client}
+
+
+def test_identity_prefers_jwt_subject():
+    token = jwt.encode({"sub": "professor"}, SECRET, algorithm=ALGORITHM)
+    assert client_identity(scope([("Authorization", f"Bearer {token}")]), SECRET, ALGORITHM) == "user:professor"
+
+
+def test_identity_falls_back_to_ip_for_invalid_token():
+    token = jwt.encode({"sub": "professor"}, "outro-segredo", algorithm=ALGORITHM)
+    assert client_identity(scope([("Authorization", f"Bearer {token}")]), SECRET, ALGORITHM) == "ip:10.0.0.1"
+
+
+def test_identity_ignores_forwarded_for_without_trusted_proxies():
+    headers = [("X-Forwarded-For", "1.2.3.4")]
+    assert client_identity(scope(headers), SECRET, ALGORITHM) == "ip:10.0.0.1"
+
+
+@pytest.mark.parametrize(
+    "forwarded, hops, expected",
+    [
+        ("1.1.1.1, 9.9.9.9", 1, "ip:9.9.9.9"),
+        ("1.1.1.1, 9.9.9.9", 2, "ip:1.1.1.1"),
+        ("forjado, 1.1.1.1, 9.9.9.9", 2, "ip:1.1.1.1"),
+        ("9.9.9.9", 2, "ip:10.0.0.1"),  # menos endereços que proxies: usa o socket
+        (" , ", 1, "ip:10.0.0.1"),
+    ],
+)
+def test_identity_with_trusted_proxy_hops(forwarded, hops, expected):
+    headers = [("X-Forwarded-For", forwarded)]
+    assert client_identity(scope(headers), SECRET, ALGORITHM, trusted_proxy_hops=hops) == expected
+
+
+def test_identity_without_client():
+    assert client_identity(scope(client=None), SECRET, ALGORITHM) == "ip:desconhecido"
+
+
+def test_pool_saturated():
+    engine = SimpleNamespace(pool=SimpleNamespace(checkedout=lambda: 15))
+    assert pool_saturated(engine, 15)
+    assert not pool_saturated(engine, 16)
+    # Pools sem contagem (NullPool) nunca saturam
+    assert not pool_saturated(SimpleNamespace(pool=object()), 1)
+
+
+def make_client(**options):
+    app = FastAPI()
+
+    @app.post("/auth/login")
+    def login():
+        return {}
+
+    @app.get("/health")
+    def health():
+        return {}
+
+    @app.get("/questions/")
+    def questions():
+        return []
+
+    options.setdefault("budgets", {
+        "auth": Budget(rate=0.001, capacity=2),
+        "write": Budget(rate=1.0, capacity=10),
+        "read": Budget(rate=1.0, capacity=10),
+        "export": Budget(rate=1.0, capacity=10),
+    })
+    app.add_middleware(AdmissionControlMiddleware, secret_key=SECRET, algorithm=ALGORITHM, **options)
+    return TestClient(app)
+
+
+def test_middleware_returns_429_with_retry_after():
+    client = make_client()
+    assert [client.post("/auth/login").status_code for _ in range(2)] == [200, 200]
+    response = client.post("/auth/login")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_middleware_does_not_trust_spoofed_forwarded_for():
+    client = make_client()
+    statuses = [client.post("/auth/login", headers={"X-Forwarded-For": f"1.2.3.{i}"}).status_code for i in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_middleware_exempt_paths():
+    client = make_client(budgets={name: Budget(rate=0.001, capacity=0) for name in ("auth", "write", "read", "export")})
+    assert client.get("/health").status_code == 200
+    assert client.get("/questions/").status_code == 429
+
+
+def test_middleware_sheds_load_when_pool_is_saturated():
+    engine = SimpleNamespace(pool=SimpleNamespace(checkedout=lambda: 5))
+    response = make_client(engine=engine, max_db_connections=5).get("/questions/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_middleware_sheds_load_over_in_flight_limit():
+    response = make_client(max_in_flight=0).get("/questions/")
+    assert response.status_code == 503